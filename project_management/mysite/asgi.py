@@ -2,6 +2,8 @@
 ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn mysite.asgi:application``) to
+enable the /api/events/stream/ Server-Sent Events endpoint.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -0,0 +1,224 @@
+"""
+Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` counts the queries a request runs and the
+time they take. It reports them in a ``Server-Timing`` header, flags
+statements that run more than once with the same SQL (the N+1 signature of
+per-row lookups in loops and nested serializers) and logs a JSON line to
+``mysite.requests`` for requests slower than ``SLOW_REQUEST_MS``. Totals per
+view are kept in memory and returned by ``view_stats()``. They are per
+process and reset on restart.
+
+Queries are seen through an execute wrapper installed once on every
+database connection. The wrapper looks up the current request's collector
+in a ContextVar, so it also sees queries run by ``sync_to_async`` threads,
+and costs one ContextVar lookup when no request is being measured.
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('mysite.requests')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    # Runs of one statement from this count up are reported as duplicates
+    'DUPLICATE_THRESHOLD': 2,
+}
+
+_collector = ContextVar('query_collector', default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_INSTRUMENTATION', {})}
+
+
+class QueryCollector:
+    """The statements run during one request, grouped by SQL text."""
+
+    def __init__(self):
+        self.statements = {}
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Reads of the async views may run on several threads at once;
+            # only one request owns the collector, so lost updates are rare
+            # and only ever affect the counts
+            self.count += 1
+            self.duration += elapsed
+            entry = self.statements.get(sql)
+            if entry is None:
+                self.statements[sql] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def duplicates(self, threshold):
+        """Statements run at least ``threshold`` times, most repeated first."""
+        repeated = [
+            (sql, count, duration) for sql, (count, duration) in self.statements.items()
+            if count >= threshold
+        ]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+def _execute(execute, sql, params, many, context):
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+def install_wrapper(sender=None, connection=None, **kwargs):
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+class ViewStats:
+    """Thread-safe totals per view."""
+
+    FIELDS = ('requests', 'slow_requests', 'queries', 'duplicate_queries', 'total_ms', 'db_ms', 'max_ms')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, duration_ms, collector, duplicate_queries, slow):
+        with self._lock:
+            row = self._views.get(view)
+            if row is None:
+                row = self._views[view] = dict.fromkeys(self.FIELDS, 0)
+            row['requests'] += 1
+            row['slow_requests'] += slow
+            row['queries'] += collector.count
+            row['duplicate_queries'] += duplicate_queries
+            row['total_ms'] += duration_ms
+            row['db_ms'] += collector.duration * 1000
+            row['max_ms'] = max(row['max_ms'], duration_ms)
+
+    def snapshot(self):
+        with self._lock:
+            views = {view: dict(row) for view, row in self._views.items()}
+        for row in views.values():
+            requests = row['requests']
+            row['avg_ms'] = row['total_ms'] / requests
+            row['avg_db_ms'] = row['db_ms'] / requests
+            row['avg_queries'] = row['queries'] / requests
+            for field in ('total_ms', 'db_ms', 'max_ms', 'avg_ms', 'avg_db_ms', 'avg_queries'):
+                row[field] = round(row[field], 2)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+stats = ViewStats()
+
+
+def view_stats():
+    """Totals per view name since the process started (or the last reset)."""
+    return stats.snapshot()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Unmatched paths are grouped so arbitrary URLs cannot grow the table
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_wrapper)
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection=connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, start)
+
+    async def __acall__(self, request):
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, start)
+
+    def finish(self, request, response, collector, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        config = self.config
+        duplicates = collector.duplicates(config['DUPLICATE_THRESHOLD'])
+        # Runs beyond the first of each repeated statement
+        duplicate_queries = sum(count - 1 for _, count, _ in duplicates)
+        slow = duration_ms >= config['SLOW_REQUEST_MS']
+        view = view_name(request)
+        stats.record(view, duration_ms, collector, duplicate_queries, slow)
+
+        if config['SERVER_TIMING']:
+            metrics = [
+                f'db;dur={collector.duration * 1000:.2f};desc="{collector.count} queries"',
+                f'app;dur={duration_ms:.2f}',
+            ]
+            if duplicate_queries:
+                metrics.append(f'dup;desc="{duplicate_queries} duplicate queries"')
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = ', '.join(([existing] if existing else []) + metrics)
+
+        if slow:
+            user = getattr(request, 'user', None)
+            entry = {
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'user_id': getattr(user, 'pk', None),
+                'duration_ms': round(duration_ms, 2),
+                'db_ms': round(collector.duration * 1000, 2),
+                'queries': collector.count,
+                'duplicate_queries': duplicate_queries,
+                'duplicates': [
+                    {'sql': sql[:500], 'count': count, 'ms': round(seconds * 1000, 2)}
+                    for sql, count, seconds in duplicates[:5]
+                ],
+            }
+            logger.warning('slow request %s', json.dumps(entry), extra={'request_stats': entry})
+        return response
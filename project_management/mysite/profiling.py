@@ -0,0 +1,209 @@
+"""
+On-demand cProfile capture of single requests.
+
+``ProfilingMiddleware`` runs a view under cProfile when an admin asks for it
+with the ``X-Profile`` header or the ``?profile`` query flag, or when a view
+listed in ``REQUEST_PROFILING['SAMPLE_RATES']`` is picked at random (e.g.
+``{'dashboard-stats': 0.01}`` profiles 1% of dashboard requests). Only the
+view is profiled, not the middleware around it, and only sync views:
+coroutines are not profiled. Under ASGI the middleware stays async, so
+async views and requests nobody asked to profile never use a worker
+thread.
+
+Each profile is saved as ``<timestamp>-<view>-<id>.prof`` in ``DIRECTORY``
+for ``python -m pstats`` or snakeviz; the oldest files are removed past
+``MAX_FILES``. Requests an admin asked to profile get the file name in
+``X-Profile-Id`` and the top functions by cumulative time in
+``X-Profile-Summary``. The full summary of any saved profile is served at
+``/api/profiles/<id>/``.
+
+cProfile can only trace one request at a time, so concurrent requests are
+served unprofiled while a profile is being taken.
+"""
+import cProfile
+import os
+import pstats
+import random
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import AuthenticationFailed
+
+from project_api.authentication import CachedUserJWTAuthentication
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIRECTORY': 'profiles',
+    'HEADER': 'X-Profile',
+    'QUERY_PARAM': 'profile',
+    'SAMPLE_RATES': {},
+    'TOP': 20,
+    'HEADER_TOP': 5,
+    'MAX_FILES': 500,
+}
+
+PROFILE_ID = re.compile(r'^[\w.-]+\.prof$')
+
+_busy = threading.Lock()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+
+def get_directory():
+    return Path(get_config()['DIRECTORY'])
+
+
+def can_profile(user):
+    """Whether ``user`` may ask for profiles and read them: admins, as in the API."""
+    return user is not None and user.is_authenticated and getattr(user, 'role', None) == 'ADMIN'
+
+
+def is_admin(request):
+    """Whether the session or the bearer token belongs to an admin."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = CachedUserJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = result[0] if result else None
+    return can_profile(user)
+
+
+def summarize(stats, limit):
+    """The ``limit`` functions with the highest cumulative time."""
+    stats.sort_stats('cumulative')
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        filename, line, name = func
+        _, calls, tottime, cumtime, _ = stats.stats[func]
+        location = f'{os.path.basename(filename)}:{line}' if line else filename
+        rows.append({
+            'function': f'{name} ({location})',
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    return {'total_ms': round(stats.total_tt * 1000, 3), 'functions': rows}
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    directory = get_directory()
+    if not directory.is_dir():
+        return []
+    return sorted((path.name for path in directory.glob('*.prof')), reverse=True)
+
+
+def profile_path(profile_id):
+    """Path of a saved profile, or None if ``profile_id`` does not name one."""
+    # The pattern has no path separators, so ids cannot leave the directory
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = get_directory() / profile_id
+    return path if path.is_file() else None
+
+
+def load_summary(profile_id, limit=None):
+    """Summary of a saved profile, or None if ``profile_id`` does not name one."""
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    return summarize(pstats.Stats(str(path)), limit or get_config()['TOP'])
+
+
+def _prune(directory, keep):
+    for name in sorted(path.name for path in directory.glob('*.prof'))[:-keep]:
+        (directory / name).unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_config()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django adapts a sync process_view with sync_to_async
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def flagged(self, request, config):
+        flag = request.headers.get(config['HEADER']) or request.GET.get(config['QUERY_PARAM'])
+        return flag not in (None, '', '0', 'false')
+
+    def sampled(self, request, config):
+        rate = config['SAMPLE_RATES'].get(request.resolver_match.view_name, 0)
+        return rate > 0 and random.random() < rate
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = get_config()
+        if iscoroutinefunction(view_func):
+            return None
+        requested = self.flagged(request, config) and is_admin(request)
+        if not requested and not self.sampled(request, config):
+            return None
+        return self.profile(request, view_func, view_args, view_kwargs, requested, config)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        config = get_config()
+        if iscoroutinefunction(view_func):
+            return None
+        # Only the admin check may need the database
+        requested = self.flagged(request, config) and await sync_to_async(is_admin)(request)
+        if not requested and not self.sampled(request, config):
+            return None
+        return await sync_to_async(self.profile)(
+            request, view_func, view_args, view_kwargs, requested, config
+        )
+
+    def profile(self, request, view_func, view_args, view_kwargs, requested, config):
+        if not _busy.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+            # DRF responses are otherwise rendered after process_view returns;
+            # render them here so that serialization is part of the profile
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                profiler.runcall(response.render)
+        finally:
+            _busy.release()
+
+        profile_id = self.save(profiler, request, config)
+        if requested:
+            summary = summarize(pstats.Stats(profiler), config['HEADER_TOP'])
+            response['X-Profile-Id'] = profile_id
+            response['X-Profile-Summary'] = '; '.join(
+                f"{row['cumtime_ms']:.1f}ms {row['function']}" for row in summary['functions']
+            )
+        return response
+
+    def save(self, profiler, request, config):
+        directory = Path(config['DIRECTORY'])
+        directory.mkdir(parents=True, exist_ok=True)
+        view = re.sub(r'[^\w.-]', '_', request.resolver_match.view_name or 'view')
+        profile_id = f"{datetime.now():%Y%m%dT%H%M%S%f}-{view}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(directory / profile_id)
+        _prune(directory, config['MAX_FILES'])
+        return profile_id
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mysite.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -52,6 +54,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so that its process_view wraps only the view
+    'mysite.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
@@ -82,9 +86,129 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a connection is reused across requests (0 closes it after
+        # each request). Defaults to 0 because ASGI requests do not own a
+        # thread; set DJANGO_DB_CONN_MAX_AGE (e.g. 60) when serving via WSGI.
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so a writer
+            # waits for busy_timeout instead of failing when it upgrades a
+            # read lock in the middle of the transaction
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Read-only copy of default for reporting queries (see project_api.routers
+# and project_api.replica). NAME may be a second SQLite file or
+# "file:replica?mode=memory&cache=shared" for an in-process copy. Either is
+# filled from default with the SQLite backup API. Tests read it through the
+# default test database.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.environ.get('DJANGO_DB_REPLICA_NAME', BASE_DIR / 'db.replica.sqlite3'),
+    'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+    'CONN_HEALTH_CHECKS': True,
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['project_api.routers.ReplicaRouter']
+
+# ENABLED sends reporting views to the replica; REFRESH_INTERVAL is the
+# number of seconds between copies (0: one copy when the process starts
+# serving, then only `manage.py refresh_replica`).
+REPLICA = {
+    'ENABLED': os.environ.get('DJANGO_DB_REPLICA_ENABLED', '') == '1',
+    'REFRESH_INTERVAL': int(os.environ.get('DJANGO_DB_REPLICA_REFRESH_INTERVAL', 30)),
+}
+
+# Applied to every new SQLite connection (see project_api.sqlite). WAL lets
+# readers proceed while a write is in progress; synchronous=NORMAL is
+# durable across application crashes in WAL mode; a negative cache_size is
+# in KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+    'temp_store': 'memory',
+}
+
+# Attempts made by @retry_on_lock write views when SQLite stays locked
+# past busy_timeout.
+SQLITE_LOCK_RETRIES = 3
+
+# Per-request query counting (see mysite.middleware): a Server-Timing header
+# on every response, a JSON log line on 'mysite.requests' for requests slower
+# than SLOW_REQUEST_MS, and per-view totals at /api/stats/views/ (admins).
+QUERY_INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'DUPLICATE_THRESHOLD': 2,
+}
+
+# cProfile capture of single requests (see mysite.profiling). Admins send
+# 'X-Profile: 1' or '?profile=1'; SAMPLE_RATES maps view names to the
+# fraction of their requests profiled for everyone, e.g.
+# {'dashboard-stats': 0.01}. Profiles are listed at /api/profiles/.
+REQUEST_PROFILING = {
+    'ENABLED': True,
+    'DIRECTORY': os.environ.get('DJANGO_PROFILE_DIR', BASE_DIR / 'profiles'),
+    'SAMPLE_RATES': {},
+    'MAX_FILES': 500,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Any backend works for the dashboard cache, e.g. the file-based
+# 'django.core.cache.backends.filebased.FileBasedCache' when several
+# processes should share entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'project-management',
     }
 }
 
+# Seconds a dashboard_stats payload may be served from the cache. Entries are
+# invalidated earlier whenever a relevant Task, Project or membership changes.
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Seconds a user's owned/member project ids may be reused across requests.
+# 0 keeps the membership lookup request-scoped only.
+MEMBERSHIP_CACHE_TIMEOUT = 0
+
+# Maximum number of Gantt rows embedded in dashboard_stats; the rest is paged
+# through /api/dashboard/timeline/.
+DASHBOARD_TIMELINE_LIMIT = 500
+
+
+# Notification fan-out (see project_api.notifications). With BACKGROUND
+# enabled, rows are written by an in-process worker after the request commits.
+NOTIFICATION_DISPATCH = {
+    'BACKGROUND': False,
+    'BATCH_SIZE': 500,
+    'BUFFER_SIZE': 10000,
+    'FLUSH_INTERVAL': 0.5,
+}
+
+# Run the independent reads of the /api/async/ views on separate threads and
+# database connections so they overlap (see project_api.async_views).
+ASYNC_CONCURRENT_READS = True
+
+# Server-Sent Events stream at /api/events/stream/ (ASGI only, see
+# project_api.events). QUEUE_SIZE bounds the events buffered per connection
+# before the client is told to resync; HEARTBEAT_INTERVAL is in seconds.
+EVENT_STREAM = {
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT_INTERVAL': 15,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -128,7 +252,7 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'project_api.authentication.CachedUserJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -156,3 +280,20 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'project_api.User'
 
+# Seconds an authenticated user's row is cached; changes made in another
+# process are seen after at most this long (see project_api.authentication).
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# In-memory refresh token revocation check (see project_api.tokens), in
+# seconds: how often blacklist additions from other processes are read, and
+# how often the whole set is reloaded.
+TOKEN_REVOCATION = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# Seconds between background runs of the expired token pruning; 0 leaves it
+# to `manage.py prune_tokens`.
+TOKEN_PRUNE_INTERVAL = 0
+TOKEN_PRUNE_BATCH_SIZE = 1000
+
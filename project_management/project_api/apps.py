@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ProjectApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project_api'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .replica import start_refreshing
+        from .sqlite import configure_connection
+        from .tokens import start_pruning
+
+        connection_created.connect(configure_connection)
+        request_started.connect(start_pruning)
+        request_started.connect(start_refreshing)
@@ -0,0 +1,174 @@
+"""
+Async variants of the read-heavy endpoints, mounted under /api/async/.
+
+They return the same payloads as their sync counterparts but never hold a
+worker thread while waiting on the database. Reads that do not depend on
+each other are started together with ``asyncio.gather``. With
+``ASYNC_CONCURRENT_READS`` enabled, each read runs on its own pool thread
+and database connection, so the queries really overlap. Otherwise they
+share Django's single thread-sensitive executor, the same way the async ORM
+does. Serve them through ``mysite.asgi``; under WSGI every request is still
+run on one event loop per request thread.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import cache as dashboard_cache
+from .authentication import jwt_required
+from .membership import get_membership
+from .models import Project, Task, User
+from .serializers import ProjectSerializer, TaskSerializer, UserSerializer
+from .stats import aggregate_tasks_by_assignee, combine_dashboard_stats, read_member_counters
+from .timeline import MAX_PAGE_SIZE, timeline_page, timeline_queryset
+from .views import apply_fetch_plan, dashboard_querysets
+
+
+def _isolated(func):
+    # Pool threads keep their own connection; treat every call like a
+    # request so CONN_MAX_AGE is honoured and broken connections are dropped
+    def wrapper(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+async def read(func, *args):
+    """Run the sync ORM callable ``func`` without blocking the event loop."""
+    if getattr(settings, 'ASYNC_CONCURRENT_READS', False):
+        return await sync_to_async(_isolated(func), thread_sensitive=False)(*args)
+    return await sync_to_async(func)(*args)
+
+
+async def gather_reads(*calls):
+    """Run ``(func, *args)`` tuples concurrently and return their results."""
+    return await asyncio.gather(*(read(*call) for call in calls))
+
+
+def get_only(view):
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def build_dashboard_payload(user):
+    tasks, team_members = dashboard_querysets(user)
+    groups, member_rows, timeline_data = await gather_reads(
+        (aggregate_tasks_by_assignee, tasks),
+        (read_member_counters, team_members),
+        (timeline_page, timeline_queryset(tasks), None,
+         getattr(settings, 'DASHBOARD_TIMELINE_LIMIT', MAX_PAGE_SIZE)),
+    )
+    task_stats, team_efficiency = combine_dashboard_stats(groups, member_rows)
+    return {
+        'taskStats': task_stats,
+        'teamEfficiency': team_efficiency,
+        'timelineData': timeline_data
+    }
+
+
+@jwt_required
+@get_only
+async def dashboard_stats(request):
+    # Read from default like the sync view, since the payload is cached
+    payload = await dashboard_cache.aget_or_build(request.user, build_dashboard_payload)
+    return JsonResponse(payload)
+
+
+def serialize_users(queryset):
+    return UserSerializer(queryset, many=True).data
+
+
+@jwt_required
+@get_only
+async def get_team_members(request):
+    team_members = User.objects.filter(is_approved=True, role='TEAM_MEMBER')
+    return JsonResponse(await read(serialize_users, team_members), safe=False)
+
+
+@jwt_required
+@get_only
+async def get_users_by_status(request):
+    approved_users, pending_users = await gather_reads(
+        (serialize_users, User.objects.filter(is_approved=True).exclude(role='ADMIN')),
+        (serialize_users, User.objects.filter(is_approved=False)),
+    )
+    return JsonResponse({
+        'approved_users': approved_users,
+        'pending_users': pending_users
+    })
+
+
+def serialize_page(queryset, serializer):
+    serializer.instance = list(queryset)
+    return serializer.data
+
+
+async def paginated_response(request, queryset, serializer):
+    """
+    Page-number pagination in the shape DRF's ``PageNumberPagination``
+    renders, with the COUNT and the page itself read concurrently.
+    """
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+    if page < 1:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+    offset = (page - 1) * page_size
+    count, results = await gather_reads(
+        (queryset.count,),
+        (serialize_page, queryset[offset:offset + page_size], serializer),
+    )
+    if page > 1 and offset >= count:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+    return JsonResponse({
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': results,
+    })
+
+
+@jwt_required
+@get_only
+async def task_list(request):
+    user = request.user
+    serializer = TaskSerializer(many=True, context={'request': Request(request)})
+    tasks = Task.objects.all() if user.role == 'ADMIN' else Task.objects.filter(assigned_to=user)
+    if 'comment_count' in serializer.child.fields:
+        tasks = tasks.with_comment_count()
+    tasks = apply_fetch_plan(tasks.order_by('pk'), serializer.child)
+    return await paginated_response(request, tasks, serializer)
+
+
+@jwt_required
+@get_only
+async def project_list(request):
+    visible_ids = (await sync_to_async(get_membership)(request)).visible_ids
+    serializer = ProjectSerializer(many=True, context={'request': Request(request)})
+    projects = Project.objects.filter(pk__in=visible_ids).with_completion()
+    projects = apply_fetch_plan(projects.order_by('pk'), serializer.child)
+    return await paginated_response(request, projects, serializer)
@@ -0,0 +1,148 @@
+"""
+JWT authentication with a cached user row.
+
+``CachedUserJWTAuthentication`` builds ``request.user`` from the user's id,
+username, role, approval and active flags, read from the database and kept
+in the cache for ``AUTH_USER_CACHE_TIMEOUT`` seconds, so a user costs at
+most one query per timeout rather than one per request. Other fields are
+deferred and cost a query each when read, so views that serialize the
+acting user (as a project owner or comment author) load it once with
+``load_full_user``.
+
+The database stays the source of truth: saving or deleting a user drops the
+cached row once the transaction commits (see ``invalidate_user``), and a
+row that was culled, lost on restart or never cached in this process is
+read again. With a per-process cache, other processes see a change within
+``AUTH_USER_CACHE_TIMEOUT`` seconds; set it to 0 to read the row on every
+request. The username, role and approval claims of ``tokens_for_user()``
+are for clients only and are never trusted for authorization, since they
+outlive changes to the user until the refresh token expires.
+
+The module also provides JWT authentication for the plain Django async
+views, which DRF's authentication classes cannot be attached to.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .tokens import RefreshToken
+
+CLAIM_FIELDS = ('username', 'role', 'is_approved')
+USER_FIELDS = ('id', *CLAIM_FIELDS, 'is_active')
+
+
+def get_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def tokens_for_user(user):
+    """Return a refresh token (and through it an access token) with user claims."""
+    refresh = RefreshToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        refresh[field] = getattr(user, field)
+    return refresh
+
+
+def invalidate_user(user_id):
+    """Drop the cached row of ``user_id`` once the transaction commits."""
+    transaction.on_commit(lambda: cache.delete(user_key(user_id)))
+
+
+def build_user(fields):
+    """A User instance from ``fields``; any other field is deferred."""
+    # from_db expects the values in the model's field order
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in fields]
+    return User.from_db(router.db_for_read(User), names, [fields[name] for name in names])
+
+
+def load_full_user(user):
+    """``user`` with every column loaded in one query, for serializing it."""
+    if not user.get_deferred_fields():
+        return user
+    return User.objects.get(pk=user.pk)
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+        # Tokens carry the id as a string; the cache key and the built user
+        # need the real pk type to compare equal to related instances
+        try:
+            user_id = User._meta.pk.to_python(user_id)
+        except ValidationError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        timeout = get_timeout()
+        fields = cache.get(user_key(user_id)) if timeout else None
+        if fields is None:
+            fields = User.objects.filter(pk=user_id).values(*USER_FIELDS).first()
+            if fields is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if timeout:
+                cache.set(user_key(user_id), fields, timeout)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not fields['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return build_user(fields)
+
+
+def get_raw_token(request, authentication, allow_query_token=False):
+    header = authentication.get_header(request)
+    if header is not None:
+        return authentication.get_raw_token(header)
+    token = request.GET.get('token') if allow_query_token else None
+    return token.encode() if token else None
+
+
+async def authenticate(request, allow_query_token=False):
+    """Return the user of the request's access token, or None."""
+    authentication = CachedUserJWTAuthentication()
+    try:
+        raw_token = get_raw_token(request, authentication, allow_query_token)
+        if raw_token is None:
+            return None
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+
+
+def jwt_required(view=None, allow_query_token=False):
+    """
+    Async counterpart of ``IsAuthenticated``: sets ``request.user`` from the
+    access token or answers 401.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await authenticate(request, allow_query_token)
+            if user is None:
+                return JsonResponse(
+                    {'error': 'Authentication credentials were not provided or are invalid'},
+                    status=401
+                )
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator(view) if view is not None else decorator
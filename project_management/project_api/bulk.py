@@ -0,0 +1,128 @@
+"""
+Set-based task operations behind the TaskViewSet bulk endpoints.
+
+Callers read the affected rows with one ``load_rows`` query inside the
+transaction that changes them. Each operation applies the change with a
+single UPDATE/DELETE (or one ``bulk_create``) and then adjusts User
+counters, dashboard caches and notifications in batch.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache as dashboard_cache
+from . import events
+from .counters import apply_deltas, batched, collect_deltas, contribution
+from .models import Notification, Task
+from .notifications import send
+
+MAX_ITEMS = 500
+
+ROW_FIELDS = ('id', 'title', 'project_id', 'assigned_to_id', 'status', 'due_date', 'updated_at')
+
+
+def parse_body(data):
+    """The request body of a bulk update, which must be a JSON object."""
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    return data
+
+
+def parse_id(value, name):
+    """Validate a single object id from a request body."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+
+
+def parse_ids(value):
+    """Validate a list of task ids from a request body."""
+    if not isinstance(value, list) or not value:
+        raise ValueError('ids must be a non-empty list')
+    if len(value) > MAX_ITEMS:
+        raise ValueError(f'At most {MAX_ITEMS} tasks can be changed at once')
+    try:
+        return sorted({int(task_id) for task_id in value})
+    except (TypeError, ValueError):
+        raise ValueError('ids must be integers')
+
+
+def load_rows(ids):
+    """
+    Return ``{id: row}`` for the existing tasks among ``ids``, locked until
+    the surrounding transaction ends. (SQLite has no row locks; there the
+    IMMEDIATE transaction mode already holds the write lock.)
+    """
+    rows = Task.objects.select_for_update().filter(pk__in=ids).values(*ROW_FIELDS)
+    return {row['id']: row for row in rows}
+
+
+def row_state(row):
+    return (
+        row['assigned_to_id'],
+        contribution(row['status'], row['due_date'], row['updated_at']),
+    )
+
+
+def assignment_notifications(rows, exclude_user_id=None):
+    return [
+        Notification(
+            user_id=row['assigned_to_id'],
+            type='task',
+            title=f"New Task: {row['title']}",
+            message=f"You have been assigned to task \"{row['title']}\""
+        )
+        for row in rows
+        if row['assigned_to_id'] and row['assigned_to_id'] != exclude_user_id
+    ]
+
+
+def update_tasks(rows, **changes):
+    """Apply ``changes`` to every task in ``rows`` with one UPDATE."""
+    now = timezone.now()
+    transitions = [
+        (row_state(row), row_state({**row, **changes, 'updated_at': now}))
+        for row in rows.values()
+    ]
+    with transaction.atomic(), batched():
+        updated = Task.objects.filter(pk__in=list(rows)).update(updated_at=now, **changes)
+        apply_deltas(collect_deltas(transitions))
+        if 'status' in changes:
+            events.publish_task_status([
+                {**row, **changes} for row in rows.values() if row['status'] != changes['status']
+            ])
+    assignees = {state[0] for transition in transitions for state in transition}
+    dashboard_cache.bump_for_assignees(*assignees)
+    return updated
+
+
+def delete_tasks(rows):
+    """Delete the tasks in ``rows`` (and their comments) in one transaction."""
+    with transaction.atomic(), batched():
+        # The collector still sends post_delete per task; batched() merges
+        # the resulting counter deltas into one UPDATE per assignee
+        deleted = Task.objects.filter(pk__in=list(rows)).delete()[1].get(Task._meta.label, 0)
+    dashboard_cache.bump_for_assignees(*(row['assigned_to_id'] for row in rows.values()))
+    return deleted
+
+
+def create_tasks(payloads, created_by=None):
+    """
+    Insert validated TaskSerializer payloads with ``bulk_create`` and notify
+    the assignees in one batch.
+    """
+    tasks = [
+        Task(assigned_to_id=data.pop('assigned_to_id'), **data)
+        for data in (dict(payload) for payload in payloads)
+    ]
+    with transaction.atomic(), batched():
+        tasks = Task.objects.bulk_create(tasks, batch_size=MAX_ITEMS)
+        apply_deltas(collect_deltas((None, (task.assigned_to_id, contribution(
+            task.status, task.due_date, task.updated_at
+        ))) for task in tasks))
+        send(assignment_notifications(
+            [{'title': task.title, 'assigned_to_id': task.assigned_to_id} for task in tasks],
+            exclude_user_id=created_by,
+        ))
+    dashboard_cache.bump_for_assignees(*(task.assigned_to_id for task in tasks))
+    return tasks
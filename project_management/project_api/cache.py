@@ -0,0 +1,138 @@
+"""
+Versioned cache for the dashboard_stats payload.
+
+Payloads are stored under a key that embeds generation counters instead of
+being deleted on change. Admin dashboards share the ``admin`` scope, team
+members get a ``user:<id>`` scope, and every key also embeds the ``global``
+generation. Changing a Task bumps the admin scope and the scopes of its old
+and new assignee; changing a Project, a membership or a user bumps the
+global generation. Stale entries are never read again and simply expire.
+
+Only ``get``/``add``/``incr``/``get_many`` are used, so any Django cache
+backend works, including local-memory and file-based caches.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GLOBAL_SCOPE = 'global'
+ADMIN_SCOPE = 'admin'
+
+HITS_KEY = 'dashboard:stats:hits'
+MISSES_KEY = 'dashboard:stats:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def scope_for(user):
+    return ADMIN_SCOPE if user.role == 'ADMIN' else user_scope(user.pk)
+
+
+def _generation_key(scope):
+    return f'dashboard:gen:{scope}'
+
+
+def _increment(key, initial=1):
+    cache = get_cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, None)
+        return initial
+
+
+def _generations(scopes):
+    cache = get_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            # Start from a fresh value so that entries written under an
+            # evicted generation can never be mistaken for current ones.
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        generations.append(found[key])
+    return generations
+
+
+def dashboard_key(user):
+    scope = scope_for(user)
+    global_generation, scope_generation = _generations([GLOBAL_SCOPE, scope])
+    return f'dashboard:stats:{scope}:{global_generation}:{scope_generation}'
+
+
+def get_or_build(user, builder):
+    """Return the cached dashboard payload for ``user``, building it on a miss."""
+    cache = get_cache()
+    key = dashboard_key(user)
+    payload = cache.get(key)
+    if payload is not None:
+        _increment(HITS_KEY)
+        return payload
+
+    _increment(MISSES_KEY)
+    payload = builder(user)
+    cache.set(key, payload, get_timeout())
+    return payload
+
+
+async def aget_or_build(user, builder):
+    """``get_or_build`` for async views; ``builder`` is a coroutine function."""
+    cache = get_cache()
+    key = await sync_to_async(dashboard_key)(user)
+    payload = await cache.aget(key)
+    if payload is not None:
+        await sync_to_async(_increment)(HITS_KEY)
+        return payload
+
+    await sync_to_async(_increment)(MISSES_KEY)
+    payload = await builder(user)
+    await cache.aset(key, payload, get_timeout())
+    return payload
+
+
+def bump(*scopes):
+    """
+    Invalidate every payload that depends on ``scopes``. The bump is deferred
+    until the current transaction commits so a concurrent request cannot cache
+    pre-commit data under the new generation.
+    """
+    scopes = {scope for scope in scopes if scope}
+
+    def _bump():
+        for scope in scopes:
+            _increment(_generation_key(scope), initial=time.time_ns())
+
+    transaction.on_commit(_bump)
+
+
+def bump_for_assignees(*user_ids):
+    """Invalidate the admin dashboards and those of the given assignees."""
+    bump(ADMIN_SCOPE, *(user_scope(user_id) for user_id in user_ids if user_id))
+
+
+def stats():
+    cache = get_cache()
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 3) if total else 0,
+    }
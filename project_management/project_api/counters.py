@@ -0,0 +1,176 @@
+"""
+Incremental maintenance of the per-user counters stored on ``User``: the
+performance counters (tasks_completed, tasks_on_time, tasks_delayed and
+efficiency) and the unread notification count.
+
+Every Task carries a snapshot of the counter contribution it had when it was
+loaded or last saved. Saves and deletes apply the difference between the old
+and the new contribution with a single ``UPDATE ... SET x = x + n`` per
+affected user. Bulk paths that bypass model signals call ``apply_deltas``
+with the contributions they computed themselves, and wrap their work in
+``batched()`` so that all deltas are merged into one UPDATE per user.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps as global_apps
+from django.db.models import Case, Count, F, FloatField, Value, When
+from django.db.models.functions import Cast, Greatest, Round
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .stats import COUNTER_FIELDS, aggregate_tasks_by_assignee, calculate_efficiency
+
+
+def contribution(status, due_date, updated_at):
+    """Return the (completed, on_time, delayed) contribution of one task."""
+    if status != 'DONE':
+        return (0, 0, 0)
+    if due_date is None or updated_at is None:
+        return (1, 0, 0)
+    if due_date >= timezone.localdate(updated_at):
+        return (1, 1, 0)
+    return (1, 0, 1)
+
+
+def task_state(task):
+    """The ``(assigned_to_id, contribution)`` pair for a task instance."""
+    return (
+        task.assigned_to_id,
+        contribution(task.status, task.due_date, task.updated_at),
+    )
+
+
+def collect_deltas(transitions):
+    """
+    Turn an iterable of ``(old_state, new_state)`` pairs into a dict of
+    ``user_id -> [completed, on_time, delayed]`` deltas. Either state may be
+    ``None`` for created or deleted tasks.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for old, new in transitions:
+        if old == new:
+            continue
+        if old and old[0] is not None:
+            for i, value in enumerate(old[1]):
+                deltas[old[0]][i] -= value
+        if new and new[0] is not None:
+            for i, value in enumerate(new[1]):
+                deltas[new[0]][i] += value
+    return {user_id: delta for user_id, delta in deltas.items() if any(delta)}
+
+
+_pending_deltas = ContextVar('pending_counter_deltas', default=None)
+
+
+@contextmanager
+def batched():
+    """
+    Collect every ``apply_deltas`` call made inside the block (including the
+    ones from model signals) and write the merged deltas when it exits.
+    """
+    if _pending_deltas.get() is not None:
+        yield
+        return
+
+    pending = defaultdict(lambda: [0, 0, 0])
+    token = _pending_deltas.set(pending)
+    try:
+        yield
+    finally:
+        _pending_deltas.reset(token)
+    apply_deltas({user_id: delta for user_id, delta in pending.items() if any(delta)})
+
+
+def apply_deltas(deltas):
+    """Apply counter deltas with one UPDATE per affected user."""
+    from .models import User
+
+    pending = _pending_deltas.get()
+    if pending is not None:
+        for user_id, delta in deltas.items():
+            for i, value in enumerate(delta):
+                pending[user_id][i] += value
+        return
+
+    for user_id, (completed, on_time, delayed) in deltas.items():
+        new_completed = F('tasks_completed') + completed
+        new_on_time = F('tasks_on_time') + on_time
+        User.objects.filter(pk=user_id).update(
+            tasks_completed=new_completed,
+            tasks_on_time=new_on_time,
+            tasks_delayed=F('tasks_delayed') + delayed,
+            efficiency=Case(
+                When(
+                    GreaterThan(new_completed, 0),
+                    then=Round(
+                        Cast(new_on_time, FloatField()) * 100 / new_completed,
+                        1,
+                    ),
+                ),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+
+
+def adjust_unread(deltas):
+    """
+    Apply ``user_id -> n`` changes to unread_notifications, with one UPDATE
+    per distinct ``n`` (a fan-out of one row per user is a single UPDATE).
+    The count never drops below 0, even if it was out of step with the
+    Notification table.
+    """
+    from .models import User
+
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    for delta, user_ids in by_delta.items():
+        User.objects.filter(pk__in=user_ids).update(
+            unread_notifications=Greatest(F('unread_notifications') + delta, 0)
+        )
+
+
+REBUILT_FIELDS = (*COUNTER_FIELDS, 'unread_notifications')
+
+
+def rebuild_counters(batch_size=500, apps=global_apps, fields=REBUILT_FIELDS):
+    """
+    Recompute every user's counters from the Task and Notification tables.
+    Returns the number of users written. Migrations pass their historical
+    ``apps`` and may limit the rebuild to some of ``REBUILT_FIELDS``.
+    """
+    Notification = apps.get_model('project_api', 'Notification')
+    Task = apps.get_model('project_api', 'Task')
+    User = apps.get_model('project_api', 'User')
+
+    fields = list(fields)
+    groups = {}
+    if set(fields) & set(COUNTER_FIELDS):
+        groups = aggregate_tasks_by_assignee(Task.objects.all(), timeliness=True)
+    unread = {}
+    if 'unread_notifications' in fields:
+        unread = dict(
+            Notification.objects.filter(is_read=False).order_by()
+            .values_list('user').annotate(count=Count('id'))
+        )
+    users = []
+    for user in User.objects.only('id', *fields).iterator():
+        row = groups.get(user.id, {})
+        completed, on_time = row.get('done', 0), row.get('on_time', 0)
+        values = {
+            'tasks_completed': completed,
+            'tasks_on_time': on_time,
+            'tasks_delayed': row.get('delayed', 0),
+            'efficiency': calculate_efficiency(completed, on_time),
+            'unread_notifications': unread.get(user.id, 0),
+        }
+        for field in fields:
+            setattr(user, field, values[field])
+        users.append(user)
+
+    User.objects.bulk_update(users, fields, batch_size=batch_size)
+    return len(users)
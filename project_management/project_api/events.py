@@ -0,0 +1,145 @@
+"""
+In-process pub/sub bus feeding the Server-Sent Events stream.
+
+Each connected client owns a ``Subscription``: a bounded asyncio queue bound
+to the event loop that serves it. ``publish()`` may be called from any thread
+(sync views run in a thread pool under ASGI) and hands events to the
+subscriber loops with ``call_soon_threadsafe``. A client that falls behind
+does not grow its queue without bound. Once the queue is full it is
+replaced by a single ``resync`` event, and the client refetches its state
+over the REST endpoints.
+
+Events are published when the surrounding transaction commits, so clients
+never see rows that end up rolled back. No external broker is involved, so
+only clients connected to the same process receive an event.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+RESYNC = {'event': 'resync', 'data': {}}
+
+DEFAULTS = {
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT_INTERVAL': 15,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EVENT_STREAM', {})}
+
+
+class Subscription:
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def offer(self, event):
+        """Queue ``event``; must run on ``self.loop``."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class EventBus:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, maxsize=None):
+        subscription = Subscription(
+            user_id, asyncio.get_running_loop(), maxsize or get_config()['QUEUE_SIZE']
+        )
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_ids=None):
+        with self._lock:
+            if user_ids is None:
+                return bool(self._subscriptions)
+            return any(user_id in self._subscriptions for user_id in user_ids)
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is going away anyway
+                self.unsubscribe(subscription)
+
+
+bus = EventBus()
+
+
+def publish_on_commit(user_ids, event_type, data):
+    """Send one event to every user in ``user_ids`` after the commit."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids or not bus.has_subscribers(user_ids):
+        return
+    event = {'event': event_type, 'data': data}
+
+    def _publish():
+        for user_id in user_ids:
+            bus.publish(user_id, event)
+
+    transaction.on_commit(_publish)
+
+
+def publish_notifications(notifications):
+    for notification in notifications:
+        publish_on_commit([notification.user_id], 'notification', {
+            'id': notification.pk,
+            'type': notification.type,
+            'title': notification.title,
+            'message': notification.message,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        })
+
+
+def publish_task_status(tasks):
+    """
+    Announce status changes to each task's assignee and project owner.
+    ``tasks`` are dicts with id, title, status, project_id and assigned_to_id.
+    """
+    if not tasks or not bus.has_subscribers():
+        return
+    from .models import Project
+
+    owners = dict(Project.objects.filter(
+        pk__in={task['project_id'] for task in tasks}
+    ).values_list('pk', 'owner_id'))
+    for task in tasks:
+        publish_on_commit(
+            [task['assigned_to_id'], owners.get(task['project_id'])],
+            'task_status',
+            {key: task[key] for key in ('id', 'title', 'status', 'project_id')},
+        )
+
+
+def format_event(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
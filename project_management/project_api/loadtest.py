@@ -0,0 +1,343 @@
+"""
+An in-process load harness for the API.
+
+``serve(kind)`` starts ``mysite.wsgi`` under Django's threaded development
+server, or ``mysite.asgi`` under uvicorn when it is installed, on a local
+port in a background thread. ``run(...)`` then logs in a set of users and
+has each of them send a weighted mix of requests (``MIX``) over one
+keep-alive HTTP connection until the time is up. Requests are labelled with
+an ``X-Load-Endpoint`` header, so the server-side errors logged by
+``django.request`` can be attributed to an endpoint. "database is locked"
+errors are counted separately from other failures, along with the lock
+retries logged by ``project_api.sqlite``.
+
+Everything runs in one process against the configured database; no other
+services are needed. Status flips and project creation write to that
+database, so point it at a seeded copy (see ``manage.py seed_load``). The
+simulated clients share the GIL with the server, so absolute latencies are
+pessimistic; compare runs with each other rather than with production.
+"""
+import http.client
+import json
+import logging
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from .sqlite import is_lock_error
+
+ENDPOINT_HEADER = 'X-Load-Endpoint'
+
+# Relative weight of each action in the traffic mix
+MIX = {
+    'login': 5,
+    'dashboard_stats': 30,
+    'notification_count': 30,
+    'notification_list': 10,
+    'task_status': 20,
+    'project_create': 5,
+}
+
+TASK_STATUSES = ('TODO', 'IN_PROGRESS', 'DONE')
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Recorder:
+    """Thread-safe latency, status and lock error counts per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock_errors = defaultdict(int)
+        self.lock_retries = 0
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not 200 <= status < 400:
+                self.errors[endpoint] += 1
+
+    def record_lock_error(self, endpoint):
+        with self._lock:
+            self.lock_errors[endpoint] += 1
+
+    def record_lock_retry(self):
+        with self._lock:
+            self.lock_retries += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'errors': self.errors[endpoint],
+                'lock_errors': self.lock_errors[endpoint],
+                'throughput': len(samples) / elapsed,
+                'p50_ms': percentile(samples, 0.5) * 1000,
+                'p95_ms': percentile(samples, 0.95) * 1000,
+                'p99_ms': percentile(samples, 0.99) * 1000,
+            }
+        everything = [sample for samples in self.latencies.values() for sample in samples]
+        return {
+            'duration': elapsed,
+            'requests': len(everything),
+            'throughput': len(everything) / elapsed,
+            'p50_ms': percentile(everything, 0.5) * 1000 if everything else 0,
+            'p95_ms': percentile(everything, 0.95) * 1000 if everything else 0,
+            'p99_ms': percentile(everything, 0.99) * 1000 if everything else 0,
+            'errors': sum(self.errors.values()),
+            'lock_errors': sum(self.lock_errors.values()),
+            'lock_retries': self.lock_retries,
+            'endpoints': endpoints,
+        }
+
+
+class LockErrorHandler(logging.Handler):
+    """Count lock errors from ``django.request`` and retries from ``project_api.sqlite``."""
+
+    def __init__(self, recorder):
+        super().__init__()
+        self.recorder = recorder
+
+    def emit(self, record):
+        if record.name == 'project_api.sqlite':
+            self.recorder.record_lock_retry()
+            return
+        exc = record.exc_info[1] if record.exc_info else None
+        request = getattr(record, 'request', None)
+        if exc is not None and is_lock_error(exc) and request is not None:
+            self.recorder.record_lock_error(request.headers.get(ENDPOINT_HEADER, request.path))
+
+
+@contextmanager
+def capture_lock_errors(recorder):
+    """Count lock errors while keeping the server's tracebacks off the console."""
+    handler = LockErrorHandler(recorder)
+    request_logger = logging.getLogger('django.request')
+    sqlite_logger = logging.getLogger('project_api.sqlite')
+    propagate = request_logger.propagate, sqlite_logger.propagate
+    for logger in (request_logger, sqlite_logger):
+        logger.addHandler(handler)
+        logger.propagate = False
+    try:
+        yield
+    finally:
+        for logger in (request_logger, sqlite_logger):
+            logger.removeHandler(handler)
+        request_logger.propagate, sqlite_logger.propagate = propagate
+
+
+def _serve_wsgi(host, port):
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    from mysite.wsgi import application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer((host, port), QuietHandler, allow_reuse_address=True)
+    server.set_app(application)
+    thread = threading.Thread(target=server.serve_forever, name='loadtest-wsgi', daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    return server.server_port, stop
+
+
+def _serve_asgi(host, port):
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError('Serving mysite.asgi needs uvicorn (pip install -e ".[asgi]")')
+
+    from mysite.asgi import application
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    server = uvicorn.Server(uvicorn.Config(
+        application, log_level='warning', access_log=False, lifespan='off',
+    ))
+    thread = threading.Thread(
+        target=server.run, kwargs={'sockets': [sock]}, name='loadtest-asgi', daemon=True
+    )
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError('uvicorn failed to start')
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+        sock.close()
+    return sock.getsockname()[1], stop
+
+
+@contextmanager
+def serve(kind='wsgi', host='127.0.0.1', port=0):
+    """Serve the app in a background thread and yield the port it listens on."""
+    start = {'wsgi': _serve_wsgi, 'asgi': _serve_asgi}[kind]
+    port, stop = start(host, port)
+    try:
+        yield port
+    finally:
+        stop()
+
+
+class SimulatedUser:
+    """One user sending the traffic mix over a keep-alive connection."""
+
+    def __init__(self, host, port, username, password, task_ids, member_ids, recorder, rng, think_time):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.task_ids = task_ids
+        self.member_ids = member_ids
+        self.recorder = recorder
+        self.rng = rng
+        self.think_time = think_time
+        self.connection = None
+        self.token = None
+        self.created = 0
+
+    def request(self, endpoint, method, path, body=None):
+        headers = {ENDPOINT_HEADER: endpoint}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Count it as a failed request and reconnect next time
+            self.connection.close()
+            self.connection = None
+            payload, status = b'', 0
+        self.recorder.record(endpoint, time.perf_counter() - start, status)
+        return status, payload
+
+    def login(self):
+        self.token = None
+        status, payload = self.request('login', 'POST', '/api/login/', {
+            'username': self.username, 'password': self.password,
+        })
+        if status == 200:
+            self.token = json.loads(payload)['access']
+        return self.token is not None
+
+    def task_status(self):
+        task_id = self.rng.choice(self.task_ids)
+        self.request('task_status', 'PATCH', f'/api/tasks/{task_id}/update-status/', {
+            'status': self.rng.choice(TASK_STATUSES),
+        })
+
+    def project_create(self):
+        self.created += 1
+        start = date.today()
+        self.request('project_create', 'POST', '/api/projects/', {
+            'title': f'Load test {self.username} {self.created}',
+            'description': 'Created by the load harness',
+            'status': 'TODO',
+            'start_date': start.isoformat(),
+            'deadline': (start + timedelta(days=30)).isoformat(),
+            'members': self.rng.sample(self.member_ids, min(3, len(self.member_ids))),
+        })
+
+    def step(self):
+        actions, weights = zip(*MIX.items())
+        action = self.rng.choices(actions, weights=weights)[0]
+        if action == 'task_status' and not self.task_ids:
+            action = 'dashboard_stats'
+        if action == 'login':
+            self.login()
+        elif action == 'dashboard_stats':
+            self.request(action, 'GET', '/api/dashboard/stats/')
+        elif action == 'notification_count':
+            self.request(action, 'GET', '/api/notifications/unread_count/')
+        elif action == 'notification_list':
+            self.request(action, 'GET', '/api/notifications/')
+        elif action == 'task_status':
+            self.task_status()
+        else:
+            self.project_create()
+
+    def run(self, deadline):
+        try:
+            while time.monotonic() < deadline:
+                if self.token is None and not self.login():
+                    time.sleep(0.1)
+                    continue
+                self.step()
+                if self.think_time:
+                    time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        finally:
+            if self.connection is not None:
+                self.connection.close()
+
+
+def load_users(count, prefix, seed=0):
+    """
+    Pick ``count`` approved users whose username starts with ``prefix``, with
+    the ids of the tasks each of them may flip (their own, or for admins the
+    tasks of the projects they own).
+    """
+    from .models import Task, User
+
+    candidates = list(
+        User.objects.filter(username__startswith=prefix, is_approved=True, is_active=True)
+        .order_by('pk').values_list('pk', 'username', 'role')
+    )
+    users = random.Random(seed).sample(candidates, min(count, len(candidates)))
+    result = []
+    for pk, username, role in users:
+        tasks = Task.objects.filter(project__owner=pk) if role == 'ADMIN' else Task.objects.filter(assigned_to=pk)
+        result.append((username, list(tasks.order_by('pk').values_list('pk', flat=True)[:100])))
+    return result, [pk for pk, _, _ in candidates]
+
+
+def run(port, users, member_ids, password, duration, think_time=0, seed=0, host='127.0.0.1'):
+    """
+    Drive the server on ``port`` with one thread per ``(username, task_ids)``
+    in ``users`` for ``duration`` seconds. Returns the ``Recorder`` summary.
+    """
+    recorder = Recorder()
+    simulated = [
+        SimulatedUser(host, port, username, password, task_ids, member_ids,
+                      recorder, random.Random(f'{seed}:{username}'), think_time)
+        for username, task_ids in users
+    ]
+    with capture_lock_errors(recorder):
+        start = time.monotonic()
+        deadline = start + duration
+        threads = [
+            threading.Thread(target=user.run, args=(deadline,), name=f'loadtest-{user.username}')
+            for user in simulated
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+    return recorder.summary(elapsed)
@@ -0,0 +1,110 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project_api.loadtest import percentile
+from project_api.models import User
+
+# (label, sync path, async path)
+ENDPOINTS = [
+    ('dashboard_stats', '/api/dashboard/stats/', '/api/async/dashboard/stats/'),
+    ('team_members', '/api/team-members/', '/api/async/team-members/'),
+    ('users_by_status', '/api/users/status/', '/api/async/users/status/'),
+    ('task_list', '/api/tasks/', '/api/async/tasks/'),
+    ('project_list', '/api/projects/', '/api/async/projects/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of the sync read endpoints (through the WSGI "
+        "handler, with a pool of worker threads) against their /api/async/ "
+        "variants (through the ASGI handler, on one event loop) on the "
+        "current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to authenticate as (default: first admin).')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint and mode.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once.')
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Keep the dashboard cache enabled (by default every request rebuilds it).',
+        )
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(role='ADMIN').order_by('pk').first()
+        if user is None:
+            raise CommandError('No matching user; pass --user or create an admin first')
+
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        # The test clients send Host: testserver
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['cached']:
+            overrides['DASHBOARD_CACHE_TIMEOUT'] = 0
+        count, concurrency = options['requests'], options['concurrency']
+
+        self.stdout.write(
+            f'{count} requests per endpoint, concurrency {concurrency}, as {user.username}\n'
+        )
+        self.stdout.write(
+            f"{'endpoint':<18}{'mode':<7}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>9}"
+        )
+        with override_settings(**overrides):
+            for label, sync_path, async_path in ENDPOINTS:
+                for mode, run in (
+                    ('sync', lambda: self.run_sync(sync_path, headers, count, concurrency)),
+                    ('async', lambda: asyncio.run(self.run_async(async_path, headers, count, concurrency))),
+                ):
+                    latencies, elapsed = run()
+                    self.stdout.write(
+                        f'{label:<18}{mode:<7}'
+                        f'{statistics.mean(latencies) * 1000:>9.1f}'
+                        f'{percentile(latencies, 0.5) * 1000:>9.1f}'
+                        f'{percentile(latencies, 0.95) * 1000:>9.1f}'
+                        f'{count / elapsed:>9.1f}'
+                    )
+
+    def check_response(self, path, response):
+        if response.status_code != 200:
+            raise CommandError(f'GET {path} returned {response.status_code}')
+
+    def run_sync(self, path, headers, count, concurrency):
+        client = Client()
+
+        def timed(_):
+            start = time.perf_counter()
+            response = client.get(path, headers=headers)
+            latency = time.perf_counter() - start
+            self.check_response(path, response)
+            return latency
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            latencies = list(executor.map(timed, range(count)))
+        return latencies, time.perf_counter() - start
+
+    async def run_async(self, path, headers, count, concurrency):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with slots:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latency = time.perf_counter() - start
+            self.check_response(path, response)
+            return latency
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed() for _ in range(count)))
+        return latencies, time.perf_counter() - start
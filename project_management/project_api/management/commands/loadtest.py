@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project_api import loadtest
+from project_api.seeding import DEFAULT_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the app on a local port and drive it with many concurrent "
+        "simulated users (login, dashboard and notification polls, task status "
+        "flips and project creation). Reports throughput, latency percentiles "
+        "and SQLite lock errors per endpoint. Writes to the configured "
+        "database; run it against data created by seed_load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server', choices=['wsgi', 'asgi'], default='wsgi',
+            help='Serve mysite.wsgi (threaded dev server) or mysite.asgi (uvicorn).',
+        )
+        parser.add_argument('--users', type=int, default=20, help='Concurrent simulated users.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run for.')
+        parser.add_argument(
+            '--think-time', type=float, default=0,
+            help='Mean pause in seconds between requests of one user (0 sends back to back).',
+        )
+        parser.add_argument('--prefix', default='load', help='Username prefix of the users to log in as.')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of those users.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for user and action choice.')
+        parser.add_argument('--port', type=int, default=0, help='Port to listen on (default: any free port).')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        users, member_ids = loadtest.load_users(options['users'], options['prefix'], options['seed'])
+        if not users:
+            raise CommandError(
+                f"No approved users start with '{options['prefix']}'; create some with seed_load"
+            )
+
+        try:
+            with loadtest.serve(options['server'], port=options['port']) as port:
+                self.stdout.write(
+                    f"{len(users)} users against {options['server']} on port {port} "
+                    f"for {options['duration']:g}s\n"
+                )
+                summary = loadtest.run(
+                    port, users, member_ids, options['password'], options['duration'],
+                    think_time=options['think_time'], seed=options['seed'],
+                )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        self.report(summary)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({'options': {
+                    key: options[key] for key in ('server', 'users', 'duration', 'think_time', 'seed')
+                }, **summary}, f, indent=2)
+
+    def report(self, summary):
+        self.stdout.write(
+            f"{'endpoint':<20}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'errors':>8}{'locked':>8}"
+        )
+        rows = [*summary['endpoints'].items(), ('total', summary)]
+        for endpoint, row in rows:
+            self.stdout.write(
+                f"{endpoint:<20}{row['requests']:>9}{row['throughput']:>9.1f}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                f"{row['errors']:>8}{row['lock_errors']:>8}"
+            )
+        self.stdout.write(f"\nLock retries: {summary['lock_retries']}")
+        style = self.style.WARNING if summary['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{summary['requests']} requests in {summary['duration']:.1f}s, {summary['errors']} failed"
+        ))
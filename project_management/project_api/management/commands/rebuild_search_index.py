@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project_api.search import is_indexed, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search index from the Project, Task and Comment "
+        "tables. Triggers keep it in sync; use this after restoring data or if "
+        "the index is suspected to have drifted."
+    )
+
+    def handle(self, *args, **options):
+        if not is_indexed():
+            raise CommandError('The search index is only available on SQLite')
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} projects, tasks and comments'))
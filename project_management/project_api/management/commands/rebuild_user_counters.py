@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project_api.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's tasks_completed, tasks_on_time, tasks_delayed, "
+        "efficiency and unread_notifications counters from the Task and "
+        "Notification tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of users written per UPDATE batch.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {count} users'))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from project_api import replica
+
+
+class Command(BaseCommand):
+    help = "Copy the default database over the reporting replica with the SQLite backup API."
+
+    def handle(self, *args, **options):
+        if replica.REPLICA_DB_ALIAS not in settings.DATABASES:
+            raise CommandError('No replica database is configured')
+        elapsed = replica.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed the replica in {elapsed:.2f}s'))
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from project_api.models import User
+from project_api.seeding import DEFAULT_PASSWORD, EPOCH, seed
+
+
+def parse_now(value):
+    if value == 'now':
+        return timezone.now()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = day and datetime.combine(day, datetime.min.time())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f"--now must be an ISO date or datetime, or 'now', not {value!r}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, projects, memberships, tasks, comments and "
+        "notifications for load testing. The same --seed and --now always "
+        "produce the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Users to create, admins included.')
+        parser.add_argument('--admins', type=int, default=5, help='How many of the users are admins.')
+        parser.add_argument('--projects', type=int, default=50, help='Projects to create.')
+        parser.add_argument(
+            '--members-per-project', type=int, default=8,
+            help='Approved team members added to each project.',
+        )
+        parser.add_argument('--tasks', type=int, default=5000, help='Tasks to create.')
+        parser.add_argument('--comments', type=int, default=10000, help='Comments to create.')
+        parser.add_argument('--notifications', type=int, default=10000, help='Notifications to create.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument(
+            '--prefix', default='load',
+            help='Username prefix; usernames are the prefix plus a zero-padded number.',
+        )
+        parser.add_argument(
+            '--password', default=DEFAULT_PASSWORD,
+            help='Password shared by every generated user.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows inserted per transaction.',
+        )
+        parser.add_argument(
+            '--now', default=EPOCH.isoformat(),
+            help="End of the generated year of history, as an ISO date or datetime, or 'now' "
+                 "for the current time (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'admins', 'projects', 'members_per_project', 'tasks', 'comments', 'notifications'):
+            if options[name] < 0:
+                raise CommandError(f'--{name.replace("_", "-")} cannot be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        now = parse_now(options['now'])
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(
+                f"Users with the prefix '{options['prefix']}' already exist; pass a different --prefix"
+            )
+
+        start = time.monotonic()
+        counts = seed(
+            users=options['users'],
+            admins=options['admins'],
+            projects=options['projects'],
+            members_per_project=options['members_per_project'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            notifications=options['notifications'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+            now=now,
+        )
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {summary} in {time.monotonic() - start:.1f}s'
+        ))
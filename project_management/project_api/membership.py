@@ -0,0 +1,81 @@
+"""
+Request-scoped project membership.
+
+``get_membership(request)`` loads the ids of the projects the user owns and
+the projects they are a member of with one query, and memoizes the result on
+the request. Permission checks and queryset filters then become set lookups
+instead of joins against the members table.
+
+With ``MEMBERSHIP_CACHE_TIMEOUT`` above zero the ids are also kept in the
+Django cache across requests. Entries are deleted when memberships or
+project ownership change, once the surrounding transaction commits.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Value
+
+from .models import Project
+
+
+class Membership:
+    def __init__(self, owned_ids, member_ids):
+        self.owned_ids = frozenset(owned_ids)
+        self.member_ids = frozenset(member_ids)
+        self.visible_ids = self.owned_ids | self.member_ids
+
+    def owns(self, project_id):
+        return project_id in self.owned_ids
+
+    def is_member(self, project_id):
+        return project_id in self.member_ids
+
+    def can_view(self, project_id):
+        return project_id in self.visible_ids
+
+
+def cache_key(user_id):
+    return f'membership:{user_id}'
+
+
+def get_timeout():
+    return getattr(settings, 'MEMBERSHIP_CACHE_TIMEOUT', 0)
+
+
+def load_membership(user_id):
+    """Read the owned and member project ids of a user in one query."""
+    owned = Project.objects.filter(owner_id=user_id).values_list('pk', Value(True))
+    member = Project.members.through.objects.filter(user_id=user_id).values_list(
+        'project_id', Value(False)
+    )
+    owned_ids, member_ids = set(), set()
+    for project_id, is_owner in owned.union(member, all=True):
+        (owned_ids if is_owner else member_ids).add(project_id)
+    return Membership(owned_ids, member_ids)
+
+
+def get_membership(request):
+    # DRF wraps the HttpRequest; memoize on the underlying one so that every
+    # view, permission and serializer of the request shares the result
+    http_request = getattr(request, '_request', request)
+    membership = getattr(http_request, '_membership', None)
+    if membership is not None:
+        return membership
+
+    user_id = request.user.pk
+    timeout = get_timeout()
+    membership = cache.get(cache_key(user_id)) if timeout else None
+    if membership is None:
+        membership = load_membership(user_id)
+        if timeout:
+            cache.set(cache_key(user_id), membership, timeout)
+
+    http_request._membership = membership
+    return membership
+
+
+def invalidate(*user_ids):
+    """Drop cached memberships of ``user_ids`` once the transaction commits."""
+    keys = [cache_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys and get_timeout():
+        transaction.on_commit(lambda: cache.delete_many(keys))
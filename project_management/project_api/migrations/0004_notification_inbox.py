@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+from project_api.counters import rebuild_counters
+
+
+def backfill_unread(apps, schema_editor):
+    rebuild_counters(apps=apps, fields=['unread_notifications'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('project_api', '0003_add_notification_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notification_inbox_idx'),
+        ),
+    ]
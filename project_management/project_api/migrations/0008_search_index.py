@@ -0,0 +1,144 @@
+from django.db import migrations
+
+# One FTS5 row per project, task and comment. The rowid is derived from the
+# object's id (id * 3 + 0/1/2 for projects/tasks/comments) so that triggers
+# reach a row through the rowid instead of scanning the unindexed columns.
+# The UNINDEXED columns are only returned or used for visibility filters.
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE project_api_search USING fts5(
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    project_id UNINDEXED,
+    task_id UNINDEXED,
+    assigned_to_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+# Updates only fire when indexed text or a visibility column changes, so
+# status flips and other saves leave the index alone
+TRIGGERS = [
+    """
+    CREATE TRIGGER project_api_search_project_insert AFTER INSERT ON project_api_project BEGIN
+        INSERT INTO project_api_search (rowid, kind, object_id, project_id, title, body)
+        VALUES (NEW.id * 3, 'project', NEW.id, NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_project_update AFTER UPDATE OF title, description ON project_api_project
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description BEGIN
+        UPDATE project_api_search SET title = NEW.title, body = NEW.description
+        WHERE rowid = NEW.id * 3;
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_project_delete AFTER DELETE ON project_api_project BEGIN
+        DELETE FROM project_api_search WHERE rowid = OLD.id * 3;
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_task_insert AFTER INSERT ON project_api_task BEGIN
+        INSERT INTO project_api_search (rowid, kind, object_id, project_id, task_id, assigned_to_id, title, body)
+        VALUES (NEW.id * 3 + 1, 'task', NEW.id, NEW.project_id, NEW.id, NEW.assigned_to_id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_task_update AFTER UPDATE OF title, description, project_id, assigned_to_id ON project_api_task
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description
+        OR OLD.project_id IS NOT NEW.project_id OR OLD.assigned_to_id IS NOT NEW.assigned_to_id BEGIN
+        UPDATE project_api_search
+        SET title = NEW.title, body = NEW.description, project_id = NEW.project_id, assigned_to_id = NEW.assigned_to_id
+        WHERE rowid = NEW.id * 3 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_task_move AFTER UPDATE OF project_id ON project_api_task
+    WHEN OLD.project_id IS NOT NEW.project_id BEGIN
+        UPDATE project_api_search SET project_id = NEW.project_id
+        WHERE rowid IN (SELECT id * 3 + 2 FROM project_api_comment WHERE task_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_task_delete AFTER DELETE ON project_api_task BEGIN
+        DELETE FROM project_api_search WHERE rowid = OLD.id * 3 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_comment_insert AFTER INSERT ON project_api_comment BEGIN
+        INSERT INTO project_api_search (rowid, kind, object_id, project_id, task_id, title, body)
+        VALUES (
+            NEW.id * 3 + 2, 'comment', NEW.id,
+            (SELECT project_id FROM project_api_task WHERE id = NEW.task_id),
+            NEW.task_id, '', NEW.content
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_comment_update AFTER UPDATE OF content, task_id ON project_api_comment
+    WHEN OLD.content IS NOT NEW.content OR OLD.task_id IS NOT NEW.task_id BEGIN
+        UPDATE project_api_search
+        SET body = NEW.content, task_id = NEW.task_id,
+            project_id = (SELECT project_id FROM project_api_task WHERE id = NEW.task_id)
+        WHERE rowid = NEW.id * 3 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER project_api_search_comment_delete AFTER DELETE ON project_api_comment BEGIN
+        DELETE FROM project_api_search WHERE rowid = OLD.id * 3 + 2;
+    END
+    """,
+]
+
+POPULATE = [
+    """
+    INSERT INTO project_api_search (rowid, kind, object_id, project_id, title, body)
+    SELECT id * 3, 'project', id, id, title, description FROM project_api_project
+    """,
+    """
+    INSERT INTO project_api_search (rowid, kind, object_id, project_id, task_id, assigned_to_id, title, body)
+    SELECT id * 3 + 1, 'task', id, project_id, id, assigned_to_id, title, description FROM project_api_task
+    """,
+    """
+    INSERT INTO project_api_search (rowid, kind, object_id, project_id, task_id, title, body)
+    SELECT comment.id * 3 + 2, 'comment', comment.id, task.project_id, comment.task_id, '', comment.content
+    FROM project_api_comment comment JOIN project_api_task task ON task.id = comment.task_id
+    """,
+]
+
+TRIGGER_NAMES = [
+    f'project_api_search_{model}_{event}'
+    for model, events in (
+        ('project', ('insert', 'update', 'delete')),
+        ('task', ('insert', 'update', 'move', 'delete')),
+        ('comment', ('insert', 'update', 'delete')),
+    )
+    for event in events
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only; other backends fall back to icontains searches
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [CREATE_TABLE, *TRIGGERS, *POPULATE]:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGER_NAMES:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    schema_editor.execute('DROP TABLE IF EXISTS project_api_search')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('project_api', '0007_comment_task_feed_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from project_api.counters import rebuild_counters
+
+
+def rebuild(apps, schema_editor):
+    # The performance counters on User were never written before they were
+    # maintained incrementally, so fill them from the Task table once
+    rebuild_counters(apps=apps)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('project_api', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from .counters import task_state
 
 class User(AbstractUser):
     ROLES = [
@@ -18,6 +20,7 @@ class User(AbstractUser):
     tasks_on_time = models.IntegerField(default=0)
     tasks_delayed = models.IntegerField(default=0)
     efficiency = models.FloatField(default=0)
+    unread_notifications = models.IntegerField(default=0)
 
     groups = models.ManyToManyField(
         'auth.Group',
@@ -34,6 +37,23 @@ class User(AbstractUser):
         verbose_name='user permissions',
     )
 
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Projects ``user`` owns or is a member of. The membership test is a
+        subquery on the through table rather than a join, so SQLite can
+        answer both halves of the OR from indexes without DISTINCT.
+        """
+        memberships = Project.members.through.objects.filter(user=user).values('project_id')
+        return self.filter(models.Q(owner=user) | models.Q(pk__in=memberships))
+
+    def with_completion(self):
+        """Annotate total and completed task counts in the same query."""
+        return self.annotate(
+            task_total=models.Count('tasks', distinct=True),
+            task_done=models.Count('tasks', filter=models.Q(tasks__status='DONE'), distinct=True),
+        )
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ('TODO', 'To-Do'),
@@ -51,16 +71,37 @@ class Project(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_projects')
     members = models.ManyToManyField(User, related_name='projects', blank=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
     def get_completion_percentage(self):
-        total_tasks = self.tasks.count()
+        if hasattr(self, 'task_total'):
+            # Annotated by ProjectQuerySet.with_completion()
+            total_tasks, completed_tasks = self.task_total, self.task_done
+        elif 'tasks' in getattr(self, '_prefetched_objects_cache', {}):
+            tasks = self.tasks.all()
+            total_tasks = len(tasks)
+            completed_tasks = sum(1 for task in tasks if task.status == 'DONE')
+        else:
+            total_tasks = self.tasks.count()
+            completed_tasks = self.tasks.filter(status='DONE').count() if total_tasks else 0
         if total_tasks == 0:
             return 0
-        completed_tasks = self.tasks.filter(status='DONE').count()
         return (completed_tasks / total_tasks) * 100
 
+class TaskQuerySet(models.QuerySet):
+    def with_comment_count(self):
+        """Annotate comment_count with a correlated, index-backed subquery."""
+        comments = (
+            Comment.objects.filter(task=models.OuterRef('pk')).order_by()
+            .values('task').annotate(count=models.Count('id')).values('count')
+        )
+        return self.annotate(
+            comment_count=Coalesce(models.Subquery(comments), 0)
+        )
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('TODO', 'To Do'),
@@ -84,9 +125,32 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+            models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+            models.Index(fields=['due_date', 'id'], name='task_due_date_idx'),
+        ]
+
+    # Fields that decide a task's contribution to the assignee's counters
+    COUNTER_STATE_FIELDS = ('assigned_to_id', 'status', 'due_date', 'updated_at')
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row contributed to User counters so that saves and
+        # deletes can apply the difference without re-reading the row.
+        if all(name in instance.__dict__ for name in cls.COUNTER_STATE_FIELDS):
+            instance._counter_state = task_state(instance)
+            instance._loaded_status = instance.status
+        return instance
+
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
@@ -94,6 +158,12 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_created_idx'),
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_feed_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.author.username} on {self.task.title}'
 
@@ -112,6 +182,18 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notification_inbox_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.type} notification for {self.user.username}: {self.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored read state for User.unread_notifications
+        if 'is_read' in instance.__dict__:
+            instance._was_read = instance.is_read
+        return instance
@@ -0,0 +1,177 @@
+"""
+Notification fan-out.
+
+``notify()`` writes one Notification per recipient with ``bulk_create``
+instead of one INSERT each. With ``NOTIFICATION_DISPATCH['BACKGROUND']``
+enabled, the rows are handed to an in-process worker thread once the
+current transaction commits. The worker batches them by size and flush
+interval. Its buffer is bounded: when it is full, the caller writes its
+own batch synchronously instead of queueing without limit.
+
+Tests (and shutdown code) call ``drain()`` to wait until everything that
+was queued has been written.
+"""
+import logging
+from collections import Counter
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+
+from .counters import adjust_unread
+from .events import publish_notifications
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKGROUND': False,
+    'BATCH_SIZE': 500,
+    'BUFFER_SIZE': 10000,
+    'FLUSH_INTERVAL': 0.5,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'NOTIFICATION_DISPATCH', {})}
+
+
+class NotificationDispatcher:
+    def __init__(self, background=False, batch_size=500, buffer_size=10000, flush_interval=0.5):
+        self.background = background
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, notifications):
+        if not notifications:
+            return
+        if not self.background:
+            self.write(notifications)
+            return
+        transaction.on_commit(lambda: self._enqueue(notifications))
+
+    def write(self, notifications):
+        # bulk_create skips model signals, so the unread counters are
+        # adjusted here in the same transaction
+        unread = Counter(n.user_id for n in notifications if not n.is_read)
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+            adjust_unread(unread)
+            publish_notifications(notifications)
+
+    def drain(self, timeout=None):
+        """Block until every queued notification has been written."""
+        if self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _enqueue(self, notifications):
+        self._ensure_worker()
+        for index, notification in enumerate(notifications):
+            try:
+                self._queue.put_nowait(notification)
+            except queue.Full:
+                # Backpressure: write the remainder on the caller's thread
+                self.write(notifications[index:])
+                return
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='notification-dispatcher', daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            flush_at = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            close_old_connections()
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception('Failed to write %d notifications', len(batch))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            config = get_config()
+            _dispatcher = NotificationDispatcher(
+                background=config['BACKGROUND'],
+                batch_size=config['BATCH_SIZE'],
+                buffer_size=config['BUFFER_SIZE'],
+                flush_interval=config['FLUSH_INTERVAL'],
+            )
+        return _dispatcher
+
+
+@receiver(setting_changed)
+def reset_dispatcher(setting, **kwargs):
+    global _dispatcher
+    if setting == 'NOTIFICATION_DISPATCH':
+        if _dispatcher is not None:
+            _dispatcher.drain()
+        _dispatcher = None
+
+
+def notify(users, type, title, message):
+    """Create the same notification for every user (or user id) in ``users``."""
+    get_dispatcher().dispatch([
+        Notification(user_id=getattr(user, 'pk', user), type=type, title=title, message=message)
+        for user in users
+    ])
+
+
+def send(notifications):
+    """Dispatch already built (unsaved) Notification instances."""
+    get_dispatcher().dispatch(list(notifications))
+
+
+def mark_read(user, **filters):
+    """
+    Mark the unread notifications of ``user`` matching ``filters`` as read
+    and return how many changed. The conditional UPDATE and its rowcount
+    decide which rows were unread, so concurrent calls never both count the
+    same row against ``unread_notifications``.
+    """
+    with transaction.atomic(savepoint=False):
+        updated = Notification.objects.filter(user=user, is_read=False, **filters).update(is_read=True)
+        adjust_unread({user.pk: -updated})
+    return updated
+
+
+def drain(timeout=None):
+    """Wait for the background dispatcher (if any) to write everything."""
+    return get_dispatcher().drain(timeout)
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .membership import get_membership
 
 class IsApprovedUser(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -6,8 +7,8 @@ class IsApprovedUser(permissions.BasePermission):
 
 class IsProjectOwnerOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
+        if request.user.role == 'ADMIN':
+            return True
         # For tasks, check the project owner
-        if hasattr(obj, 'project'):
-            return request.user.role == 'ADMIN' or obj.project.owner == request.user
-        # For projects
-        return request.user.role == 'ADMIN' or obj.owner == request.user 
\ No newline at end of file
+        project_id = obj.project_id if hasattr(obj, 'project_id') else obj.pk
+        return get_membership(request).owns(project_id) 
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+The read-only ``replica`` database used for reporting queries.
+
+The replica is a copy of ``default`` made with the SQLite backup API. It can
+be a second database file, or a shared in-memory database
+(``file:replica?mode=memory&cache=shared``) that lives as long as the
+process, because this module keeps one connection to it open. (Readers of
+the in-memory copy get "table is locked" errors while it is being replaced,
+so use it for tests and single-user development.) ``refresh()``
+copies ``default`` over it. A background thread makes the first copy when
+the process starts serving, then repeats it every
+``REPLICA['REFRESH_INTERVAL']`` seconds; ``manage.py refresh_replica``
+copies on demand. Requests never wait for a copy: reads go to ``default``
+until the first one has finished.
+
+Reads from the replica lag ``default`` by up to one refresh interval, so
+nothing that fills the versioned dashboard cache reads from it: a payload
+built from an older copy would be cached under a generation that claims to
+include the latest writes.
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = 'replica'
+
+DEFAULTS = {
+    'ENABLED': False,
+    'REFRESH_INTERVAL': 0,
+}
+
+_lock = threading.Lock()
+_keepers = {}
+_refreshed_at = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REPLICA', {})}
+
+
+def is_configured():
+    return get_config()['ENABLED'] and REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def is_mirror():
+    """True when the replica alias points at the default database itself (tests)."""
+    return (
+        connections[REPLICA_DB_ALIAS].settings_dict['NAME']
+        == connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    )
+
+
+def backup_to(name, using=DEFAULT_DB_ALIAS):
+    """Copy database ``using`` into the SQLite file or in-memory URI ``name``."""
+    name = str(name)
+    source = connections[using]
+    source.ensure_connection()
+    with _lock:
+        if name.startswith('file:') and 'mode=memory' in name:
+            if name not in _keepers:
+                # An in-memory database is dropped with its last connection
+                _keepers[name] = sqlite3.connect(name, uri=True, check_same_thread=False)
+            source.connection.backup(_keepers[name])
+        else:
+            target = sqlite3.connect(name)
+            try:
+                source.connection.backup(target)
+            finally:
+                target.close()
+
+
+def refresh():
+    """Copy ``default`` into the replica. Returns the time taken in seconds."""
+    global _refreshed_at
+    start = time.monotonic()
+    backup_to(connections[REPLICA_DB_ALIAS].settings_dict['NAME'])
+    _refreshed_at = time.monotonic()
+    return _refreshed_at - start
+
+
+def is_ready():
+    """Whether reads can be sent to the replica: this process has copied it."""
+    if not is_configured():
+        return False
+    return _refreshed_at is not None or is_mirror()
+
+
+_refresher = None
+
+
+def _refresh_periodically(interval):
+    """Copy now, then every ``interval`` seconds (never again when 0)."""
+    while True:
+        close_old_connections()
+        try:
+            refresh()
+        except Exception:
+            logger.exception('Failed to refresh the reporting replica')
+        finally:
+            close_old_connections()
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+def start_refreshing(**kwargs):
+    """Start the refresh thread once, if the replica is configured."""
+    global _refresher
+    interval = get_config()['REFRESH_INTERVAL']
+    if not is_configured() or is_mirror():
+        return
+    with _lock:
+        if _refresher is None:
+            _refresher = threading.Thread(
+                target=_refresh_periodically, args=(interval,),
+                name='replica-refresher', daemon=True,
+            )
+            _refresher.start()
+    request_started.disconnect(start_refreshing)
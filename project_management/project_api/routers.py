@@ -0,0 +1,77 @@
+"""
+Routes reporting reads to the ``replica`` database.
+
+Only code running inside ``reporting()`` reads from the replica: views
+decorated with ``@reporting_view``, or the safe-method requests of viewsets
+using ``ReportingViewMixin``. Every write goes to ``default``. Once a
+reporting scope has written, or while ``default`` is inside a transaction,
+its later reads go to ``default`` too, so a request always sees its own
+writes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import replica
+
+
+class ReportingScope:
+    def __init__(self):
+        self.wrote = False
+
+
+_scope = ContextVar('reporting_scope', default=None)
+
+
+@contextmanager
+def reporting():
+    """Send the reads made inside the block to the replica when it is available."""
+    token = _scope.set(ReportingScope())
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def reporting_view(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with reporting():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReportingViewMixin:
+    """Serve GET/HEAD/OPTIONS requests of a view from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with reporting():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or scope.wrote or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica.REPLICA_DB_ALIAS if replica.is_ready() else None
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope.wrote = True
+        # Explicit, so instances read from the replica are saved to default
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema with each copy
+        return False if db == replica.REPLICA_DB_ALIAS else None
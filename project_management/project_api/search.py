@@ -0,0 +1,173 @@
+"""
+Full-text search over projects, tasks and comments.
+
+On SQLite the ``project_api_search`` FTS5 table (migration 0008) holds one
+row per object and is kept in sync by triggers, so every write path,
+including bulk_create and queryset updates, updates it without Python code.
+Results are ranked with bm25, with matches in titles weighted above matches
+in descriptions and comments, and come back with a highlighted snippet.
+
+Visibility follows the list endpoints: projects and comments of the
+projects the user owns or is a member of (``ProjectViewSet``,
+``CommentViewSet``), and tasks assigned to the user, or every task for
+admins (``TaskViewSet``).
+
+Other database backends have no index; ``search`` falls back to unranked
+``icontains`` filters with the same visibility rules.
+"""
+import html
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Comment, Project, Task
+
+TABLE = 'project_api_search'
+KINDS = ('project', 'task', 'comment')
+MAX_TERMS = 10
+
+# bm25 weights in column order: kind, object_id, project_id, task_id,
+# assigned_to_id, title, body
+WEIGHTS = (0, 0, 0, 0, 0, 10.0, 1.0)
+
+# Control characters that cannot occur in stored text mark the snippet
+# highlights until the rest has been HTML-escaped
+_OPEN, _CLOSE = '\x02', '\x03'
+
+REBUILD = [
+    f'DELETE FROM {TABLE}',
+    f"""
+    INSERT INTO {TABLE} (rowid, kind, object_id, project_id, title, body)
+    SELECT id * 3, 'project', id, id, title, description FROM project_api_project
+    """,
+    f"""
+    INSERT INTO {TABLE} (rowid, kind, object_id, project_id, task_id, assigned_to_id, title, body)
+    SELECT id * 3 + 1, 'task', id, project_id, id, assigned_to_id, title, description FROM project_api_task
+    """,
+    f"""
+    INSERT INTO {TABLE} (rowid, kind, object_id, project_id, task_id, title, body)
+    SELECT comment.id * 3 + 2, 'comment', comment.id, task.project_id, comment.task_id, '', comment.content
+    FROM project_api_comment comment JOIN project_api_task task ON task.id = comment.task_id
+    """,
+    # Merge the index b-trees written by the inserts above
+    f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')",
+]
+
+
+def is_indexed():
+    return connection.vendor == 'sqlite'
+
+
+def parse_terms(query):
+    """The words of ``query``, or an empty list if it has none."""
+    return re.findall(r'\w+', query)[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """
+    An FTS5 query matching every term, the last one as a prefix so results
+    appear while the user is typing. Terms are quoted so that words like
+    AND or NEAR are searched for rather than parsed as operators.
+    """
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def highlight(snippet):
+    return html.escape(snippet).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def search(user, visible_project_ids, query, kinds=KINDS, limit=20, offset=0):
+    """
+    Objects matching ``query`` that ``user`` may see, best match first, as
+    dicts with ``type``, ``id``, ``project_id``, ``task_id``, ``title`` and
+    ``snippet`` (HTML with ``<mark>`` around the matched words).
+    """
+    terms = parse_terms(query)
+    if not terms or not kinds:
+        return []
+    if not is_indexed():
+        return _search_unindexed(user, visible_project_ids, terms, kinds, limit, offset)
+
+    project_ids = list(visible_project_ids)
+    in_projects = ', '.join(['%s'] * len(project_ids)) or 'NULL'
+    visible = [f"(kind IN ('project', 'comment') AND project_id IN ({in_projects}))"]
+    params = [*project_ids]
+    if user.role == 'ADMIN':
+        visible.append("kind = 'task'")
+    else:
+        visible.append("(kind = 'task' AND assigned_to_id = %s)")
+        params.append(user.pk)
+
+    sql = f"""
+        SELECT kind, object_id, project_id, task_id, title,
+               snippet({TABLE}, -1, %s, %s, '…', 16)
+        FROM {TABLE}
+        WHERE {TABLE} MATCH %s
+          AND kind IN ({', '.join(['%s'] * len(kinds))})
+          AND ({' OR '.join(visible)})
+        ORDER BY bm25({TABLE}, {', '.join(str(weight) for weight in WEIGHTS)})
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_OPEN, _CLOSE, match_expression(terms), *kinds, *params, limit, offset])
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': kind,
+            'id': object_id,
+            'project_id': project_id,
+            'task_id': task_id,
+            'title': title,
+            'snippet': highlight(snippet),
+        }
+        for kind, object_id, project_id, task_id, title, snippet in rows
+    ]
+
+
+def _contains_all(fields, terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(*[Q(**{f'{field}__icontains': term}) for field in fields], _connector=Q.OR)
+    return condition
+
+
+def _search_unindexed(user, visible_project_ids, terms, kinds, limit, offset):
+    results = []
+    if 'project' in kinds:
+        projects = Project.objects.filter(
+            _contains_all(['title', 'description'], terms), pk__in=visible_project_ids
+        ).values_list('pk', 'title', 'description')
+        results += [
+            {'type': 'project', 'id': pk, 'project_id': pk, 'task_id': None, 'title': title, 'snippet': html.escape(text[:200])}
+            for pk, title, text in projects.order_by('-pk')[:offset + limit]
+        ]
+    if 'task' in kinds:
+        tasks = Task.objects.filter(_contains_all(['title', 'description'], terms))
+        if user.role != 'ADMIN':
+            tasks = tasks.filter(assigned_to=user)
+        results += [
+            {'type': 'task', 'id': pk, 'project_id': project_id, 'task_id': pk, 'title': title, 'snippet': html.escape(text[:200])}
+            for pk, project_id, title, text in
+            tasks.values_list('pk', 'project_id', 'title', 'description').order_by('-pk')[:offset + limit]
+        ]
+    if 'comment' in kinds:
+        comments = Comment.objects.filter(
+            _contains_all(['content'], terms), task__project_id__in=visible_project_ids
+        ).values_list('pk', 'task__project_id', 'task_id', 'content')
+        results += [
+            {'type': 'comment', 'id': pk, 'project_id': project_id, 'task_id': task_id, 'title': '', 'snippet': html.escape(text[:200])}
+            for pk, project_id, task_id, text in comments.order_by('-pk')[:offset + limit]
+        ]
+    return results[offset:offset + limit]
+
+
+def rebuild_index():
+    """Rebuild the search index from the source tables. Returns the row count."""
+    if not is_indexed():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in REBUILD:
+            cursor.execute(sql)
+        cursor.execute(f'SELECT COUNT(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
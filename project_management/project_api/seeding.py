@@ -0,0 +1,305 @@
+"""
+Synthetic data for load testing and profiling.
+
+``seed(...)`` writes users, projects, memberships, tasks, comments and
+notifications with ``bulk_create`` in batches of ``batch_size`` rows, one
+transaction per batch. Every random choice comes from one
+``random.Random(seed)`` and timestamps are spread over the year before
+``now`` (``EPOCH`` unless another time is given, never the clock), so the
+same arguments always produce the same rows. ``explicit_timestamps`` stops
+``auto_now``/``auto_now_add`` from overwriting them.
+
+Model signals do not run for bulk inserts, so the user counters are rebuilt
+and the dashboard cache is invalidated once everything has been written.
+Every generated user shares one password (``DEFAULT_PASSWORD`` unless
+another is given), hashed once, so load tests can log in as any of them.
+"""
+import random
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache as dashboard_cache
+from .counters import rebuild_counters
+from .models import Comment, Notification, Project, Task, User
+
+DEFAULT_PASSWORD = 'seed-load-password'
+
+# Relative weights of the generated values
+TASK_STATUSES = {'TODO': 35, 'IN_PROGRESS': 25, 'DONE': 40}
+TASK_PRIORITIES = {'LOW': 30, 'MEDIUM': 50, 'HIGH': 20}
+PROJECT_STATUSES = {'TODO': 30, 'IN_PROGRESS': 50, 'DONE': 20}
+APPROVED_RATIO = 0.9
+UNASSIGNED_RATIO = 0.05
+NO_DUE_DATE_RATIO = 0.1
+ON_TIME_RATIO = 0.7
+READ_RATIO = 0.6
+
+HISTORY = timedelta(days=365)
+
+# Default end of the generated history
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+WORDS = (
+    'api', 'backlog', 'billing', 'cache', 'client', 'dashboard', 'deploy',
+    'design', 'docs', 'export', 'import', 'invoice', 'login', 'mobile',
+    'migration', 'onboarding', 'report', 'review', 'search', 'settings',
+    'signup', 'sync', 'release', 'timeline', 'upload', 'webhook',
+)
+VERBS = ('Fix', 'Build', 'Review', 'Update', 'Test', 'Refactor', 'Document', 'Plan')
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``auto_now``/``auto_now_add`` fields of ``models`` keep the values given."""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def chunks(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Generator:
+    def __init__(self, seed=0, prefix='load', password=DEFAULT_PASSWORD, batch_size=5000, stdout=None,
+                 now=EPOCH):
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.now = now
+        self.history_seconds = int(HISTORY.total_seconds())
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def weighted(self, weights, count):
+        return self.rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+    def past(self):
+        return self.now - timedelta(seconds=int(self.rng.random() * self.history_seconds))
+
+    def between(self, start, end):
+        # One random() per call whatever the span, so that a different
+        # ``now`` changes the timestamps but not the other values drawn
+        return start + timedelta(seconds=int(self.rng.random() * (end - start).total_seconds()))
+
+    def phrase(self, words=3):
+        return ' '.join(self.rng.sample(WORDS, words))
+
+    def insert(self, model, rows, label):
+        """bulk_create ``rows`` one transaction per batch; returns the saved objects."""
+        saved = []
+        for batch in chunks(rows, self.batch_size):
+            with transaction.atomic():
+                saved.extend(model.objects.bulk_create(batch, batch_size=self.batch_size))
+            self.log(f'  {label}: {len(saved)}')
+        return saved
+
+    def users(self, count, admins):
+        password = make_password(self.password)
+        rows = []
+        for number in range(count):
+            is_admin = number < admins
+            username = f'{self.prefix}{number:07d}'
+            rows.append(User(
+                username=username,
+                email=f'{username}@example.com',
+                password=password,
+                first_name=self.rng.choice(WORDS).title(),
+                last_name=self.rng.choice(WORDS).title(),
+                role='ADMIN' if is_admin else 'TEAM_MEMBER',
+                is_approved=is_admin or self.rng.random() < APPROVED_RATIO,
+                date_joined=self.past(),
+            ))
+        return self.insert(User, rows, 'users')
+
+    def projects(self, count, owners, members, members_per_project):
+        rows, statuses = [], self.weighted(PROJECT_STATUSES, count)
+        for number in range(count):
+            created_at = self.past()
+            start_date = created_at.date()
+            rows.append(Project(
+                title=f'{self.phrase(2).title()} {number}',
+                description=self.phrase(6),
+                status=statuses[number],
+                start_date=start_date,
+                deadline=start_date + timedelta(days=self.rng.randint(14, 180)),
+                owner_id=self.rng.choice(owners),
+                created_at=created_at,
+                updated_at=self.between(created_at, self.now),
+            ))
+        projects = self.insert(Project, rows, 'projects')
+
+        team = {}
+        Membership = Project.members.through
+        links = []
+        for project in projects:
+            team[project.id] = self.rng.sample(members, min(members_per_project, len(members)))
+            links.extend(Membership(project_id=project.id, user_id=user_id) for user_id in team[project.id])
+        self.insert(Membership, links, 'memberships')
+        return projects, team
+
+    def task_rows(self, count, projects, team):
+        statuses = self.weighted(TASK_STATUSES, count)
+        priorities = self.weighted(TASK_PRIORITIES, count)
+        oldest = self.now - HISTORY
+        starts = {
+            project.id: max(timezone.make_aware(datetime.combine(project.start_date, time.min)), oldest)
+            for project in projects
+        }
+        for number in range(count):
+            project = self.rng.choice(projects)
+            members = team[project.id]
+            created_at = self.between(starts[project.id], self.now)
+            due_date = None
+            if self.rng.random() >= NO_DUE_DATE_RATIO:
+                due_date = (created_at + timedelta(days=self.rng.randint(1, 60))).date()
+            status = statuses[number]
+            if status == 'DONE' and due_date is not None:
+                # Completed on time, or up to two weeks late
+                on_time = self.rng.random() < ON_TIME_RATIO
+                deadline = timezone.make_aware(datetime.combine(due_date, time.max))
+                if on_time:
+                    updated_at = self.between(created_at, min(deadline, self.now))
+                else:
+                    updated_at = min(deadline + timedelta(seconds=self.rng.randrange(1, 14 * 86400)), self.now)
+            else:
+                updated_at = self.between(created_at, self.now)
+            assigned_to = None
+            if members and self.rng.random() >= UNASSIGNED_RATIO:
+                assigned_to = self.rng.choice(members)
+            yield Task(
+                title=f'{self.rng.choice(VERBS)} {self.phrase(2)} #{number}',
+                description=self.phrase(8),
+                project_id=project.id,
+                assigned_to_id=assigned_to,
+                status=status,
+                priority=priorities[number],
+                due_date=due_date,
+                created_at=created_at,
+                updated_at=updated_at,
+            )
+
+    def tasks(self, count, projects, team):
+        """Insert tasks; returns parallel arrays of their ids, authors-to-be and dates."""
+        ids, authors, created = array('q'), array('q'), []
+        owners = {project.id: project.owner_id for project in projects}
+        for batch in chunks(self.task_rows(count, projects, team), self.batch_size):
+            with transaction.atomic():
+                Task.objects.bulk_create(batch, batch_size=self.batch_size)
+            for task in batch:
+                ids.append(task.id)
+                authors.append(task.assigned_to_id or owners[task.project_id])
+                created.append(task.created_at)
+            self.log(f'  tasks: {len(ids)}')
+        return ids, authors, created
+
+    def comments(self, count, tasks, users):
+        if not len(tasks[0]):
+            return
+        ids, authors, created = tasks
+
+        def rows():
+            for _ in range(count):
+                index = self.rng.randrange(len(ids))
+                # Mostly the assignee or project owner, sometimes anyone
+                author = authors[index] if self.rng.random() < 0.8 else self.rng.choice(users)
+                created_at = self.between(created[index], self.now)
+                yield Comment(
+                    task_id=ids[index],
+                    author_id=author,
+                    content=self.phrase(10),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+        self.insert_stream(Comment, rows(), 'comments')
+
+    def notifications(self, count, users):
+        if not users:
+            return
+
+        def rows():
+            for _ in range(count):
+                kind = 'task' if self.rng.random() < 0.8 else 'project'
+                yield Notification(
+                    user_id=self.rng.choice(users),
+                    type=kind,
+                    title=f'{kind.title()} {self.rng.choice(("assigned", "updated", "completed"))}',
+                    message=self.phrase(8),
+                    is_read=self.rng.random() < READ_RATIO,
+                    created_at=self.past(),
+                )
+        self.insert_stream(Notification, rows(), 'notifications')
+
+    def insert_stream(self, model, rows, label):
+        """Like ``insert`` but without keeping the saved objects around."""
+        total = 0
+        for batch in chunks(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            total += len(batch)
+            self.log(f'  {label}: {total}')
+
+
+def seed(users=100, admins=5, projects=50, members_per_project=8, tasks=5000, comments=10000,
+         notifications=10000, seed=0, prefix='load', password=DEFAULT_PASSWORD, batch_size=5000,
+         stdout=None, now=EPOCH):
+    """
+    Generate a dataset and return the number of rows written per model.
+    Projects are owned by admins; members, assignees and comment authors are
+    approved team members.
+    """
+    admins = min(admins, users)
+    generator = Generator(seed, prefix, password, batch_size, stdout, now)
+    with explicit_timestamps(Project, Task, Comment, Notification):
+        created = generator.users(users, admins)
+        owners = [user.id for user in created if user.role == 'ADMIN']
+        members = [user.id for user in created if user.role != 'ADMIN' and user.is_approved]
+        everyone = [user.id for user in created]
+
+        project_rows, team = [], {}
+        if owners and projects:
+            project_rows, team = generator.projects(projects, owners, members, members_per_project)
+        task_data = (array('q'), array('q'), [])
+        if project_rows and tasks:
+            task_data = generator.tasks(tasks, project_rows, team)
+        generator.comments(comments, task_data, members or everyone)
+        generator.notifications(notifications, everyone)
+
+    generator.log('  rebuilding user counters')
+    with transaction.atomic():
+        rebuild_counters()
+        dashboard_cache.bump(dashboard_cache.GLOBAL_SCOPE)
+    return {
+        'users': len(created),
+        'projects': len(project_rows),
+        'memberships': sum(len(ids) for ids in team.values()),
+        'tasks': len(task_data[0]),
+        'comments': comments if len(task_data[0]) else 0,
+        'notifications': notifications if everyone else 0,
+    }
@@ -1,6 +1,59 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import User, Project, Task, Comment, Notification
 
+
+def parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Lets clients shape GET responses with query parameters:
+
+    * ``?fields=id,title`` renders only the listed fields.
+    * ``?expand=owner`` embeds only the listed relations from
+      ``expandable_fields``; the others are collapsed to primary keys, or
+      left out when their collapsed form is ``None``.
+
+    Without either parameter the full representation is returned. Only the
+    top-level serializer of a request is affected. Views use
+    ``get_fetch_plan()`` to load exactly the relations that will be rendered.
+    """
+    # field name -> factory for the collapsed field, or None to omit it
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.collapsed_fields = set()
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return
+
+        params = request.query_params
+        if 'fields' in params:
+            requested = parse_field_list(params['fields'])
+            for name in list(self.fields):
+                if name not in requested and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+        if 'expand' in params:
+            expanded = parse_field_list(params['expand'])
+            for name, collapsed in self.expandable_fields.items():
+                if name in expanded or name not in self.fields:
+                    continue
+                self.fields.pop(name)
+                if collapsed is not None:
+                    self.fields[name] = collapsed()
+                    self.collapsed_fields.add(name)
+
+    def is_expanded(self, name):
+        return name in self.fields and name not in self.collapsed_fields
+
+    def get_fetch_plan(self):
+        """Return ``(select_related, prefetch_related)`` lookups to apply."""
+        return [], []
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -26,17 +79,23 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'task', 'author', 'content', 'created_at', 'updated_at']
         read_only_fields = ['author']
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'assigned_to': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+    }
+
     assigned_to = UserSerializer(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True)
     project_title = serializers.CharField(source='project.title', read_only=True)
+    # Only rendered when the queryset was annotated with_comment_count()
+    comment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Task
         fields = [
             'id', 'title', 'description', 'project', 'project_title',
             'assigned_to', 'assigned_to_id', 'status', 'priority', 
-            'due_date', 'created_at', 'updated_at'
+            'due_date', 'created_at', 'updated_at', 'comment_count'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
@@ -46,7 +105,33 @@ class TaskSerializer(serializers.ModelSerializer):
         task = Task.objects.create(**validated_data, assigned_to=assigned_to)
         return task
 
-class ProjectSerializer(serializers.ModelSerializer):
+    def get_fetch_plan(self):
+        select_related = []
+        if self.is_expanded('assigned_to'):
+            select_related.append('assigned_to')
+        if 'project_title' in self.fields:
+            select_related.append('project')
+        return select_related, []
+
+class BulkTaskCreateSerializer(serializers.ModelSerializer):
+    """
+    Input rows for the bulk create endpoint. Related ids are plain integers
+    so that a whole batch can be checked with one query per relation.
+    """
+    project_id = serializers.IntegerField()
+    assigned_to_id = serializers.IntegerField()
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'project_id', 'assigned_to_id', 'status', 'priority', 'due_date']
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'owner': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+        'members': lambda: serializers.PrimaryKeyRelatedField(many=True, read_only=True),
+        'tasks': None,
+    }
+
     owner = UserSerializer(read_only=True)
     members = UserSerializer(many=True, read_only=True)
     member_ids = serializers.ListField(
@@ -56,13 +141,14 @@ class ProjectSerializer(serializers.ModelSerializer):
         default=list
     )
     tasks = TaskSerializer(many=True, read_only=True, required=False)
+    completion_percentage = serializers.FloatField(source='get_completion_percentage', read_only=True)
 
     class Meta:
         model = Project
         fields = ['id', 'title', 'description', 'status', 'start_date', 
                  'deadline', 'created_at', 'updated_at', 'owner', 
-                 'members', 'member_ids', 'tasks']
-        read_only_fields = ['created_at', 'updated_at', 'tasks']
+                 'members', 'member_ids', 'tasks', 'completion_percentage']
+        read_only_fields = ['created_at', 'updated_at', 'tasks', 'completion_percentage']
 
     def create(self, validated_data):
         member_ids = validated_data.pop('member_ids', [])
@@ -81,6 +167,20 @@ class ProjectSerializer(serializers.ModelSerializer):
             instance.members.set(User.objects.filter(id__in=member_ids))
         return instance
 
+    def get_fetch_plan(self):
+        select_related, prefetch_related = [], []
+        if self.is_expanded('owner'):
+            select_related.append('owner')
+        if 'members' in self.fields:
+            prefetch_related.append('members')
+        if 'tasks' in self.fields:
+            # Prefetching through the reverse relation already fills
+            # task.project, so only the assignee needs joining
+            prefetch_related.append(Prefetch(
+                'tasks', queryset=Task.objects.select_related('assigned_to').with_comment_count()
+            ))
+        return select_related, prefetch_related
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
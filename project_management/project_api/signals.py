@@ -0,0 +1,132 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import cache as dashboard_cache
+from . import events, membership
+from .authentication import invalidate_user
+from .counters import adjust_unread, apply_deltas, collect_deltas, task_state
+from .models import Notification, Project, Task, User
+
+
+@receiver(pre_save, sender=Task)
+def load_task_counter_state(sender, instance, raw=False, **kwargs):
+    # Instances that were not loaded from the database (or were loaded with
+    # deferred fields) need their stored contribution read once before saving.
+    if raw or instance._state.adding or hasattr(instance, '_counter_state'):
+        return
+    stored = Task.objects.filter(pk=instance.pk).values(
+        'assigned_to_id', 'status', 'due_date', 'updated_at'
+    ).first()
+    instance._counter_state = task_state(Task(**stored)) if stored else None
+    instance._loaded_status = stored and stored['status']
+
+
+@receiver(post_save, sender=Task)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else instance._counter_state
+    new_state = task_state(instance)
+    apply_deltas(collect_deltas([(old_state, new_state)]))
+    instance._counter_state = new_state
+    dashboard_cache.bump_for_assignees(old_state and old_state[0], new_state[0])
+
+    if not created and getattr(instance, '_loaded_status', None) != instance.status:
+        events.publish_task_status([{
+            'id': instance.pk,
+            'title': instance.title,
+            'status': instance.status,
+            'project_id': instance.project_id,
+            'assigned_to_id': instance.assigned_to_id,
+        }])
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Task)
+def update_counters_on_delete(sender, instance, **kwargs):
+    old_state = getattr(instance, '_counter_state', None) or task_state(instance)
+    apply_deltas(collect_deltas([(old_state, None)]))
+    dashboard_cache.bump_for_assignees(old_state[0])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_dashboards(sender, raw=False, **kwargs):
+    if not raw:
+        dashboard_cache.bump(dashboard_cache.GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, raw=False, **kwargs):
+    # Approval, role and deletion changes must not be served from the cache
+    if not raw:
+        invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_dashboards_on_membership(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        dashboard_cache.bump(dashboard_cache.GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_unread = not created and not getattr(instance, '_was_read', True)
+    is_unread = not instance.is_read
+    if was_unread != is_unread:
+        adjust_unread({instance.user_id: 1 if is_unread else -1})
+    instance._was_read = instance.is_read
+    if created:
+        events.publish_notifications([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_on_delete(sender, instance, **kwargs):
+    if not getattr(instance, '_was_read', instance.is_read):
+        adjust_unread({instance.user_id: -1})
+
+
+@receiver(pre_save, sender=Project)
+def remember_project_owner(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or not membership.get_timeout():
+        return
+    instance._previous_owner_id = Project.objects.filter(pk=instance.pk).values_list(
+        'owner_id', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Project)
+def invalidate_owner_membership(sender, instance, raw=False, **kwargs):
+    if not raw:
+        membership.invalidate(instance.owner_id, getattr(instance, '_previous_owner_id', None))
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_users(sender, instance, **kwargs):
+    if not membership.get_timeout():
+        return
+    instance._affected_user_ids = [instance.owner_id, *instance.members.values_list('pk', flat=True)]
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_project_users(sender, instance, **kwargs):
+    membership.invalidate(*getattr(instance, '_affected_user_ids', [instance.owner_id]))
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # Changed from the user side (user.projects.add(...))
+        if action.startswith('post_'):
+            membership.invalidate(instance.pk)
+    elif action == 'pre_clear' and membership.get_timeout():
+        instance._cleared_member_ids = list(instance.members.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        membership.invalidate(*getattr(instance, '_cleared_member_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        membership.invalidate(*pk_set)
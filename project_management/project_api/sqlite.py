@@ -0,0 +1,66 @@
+"""
+SQLite connection tuning and lock contention handling.
+
+``configure_connection`` runs on every new SQLite connection and applies
+``SQLITE_PRAGMAS``. The defaults turn on WAL, so readers keep reading the
+last committed snapshot while a writer holds the lock instead of waiting
+for it. Writers wait up to ``busy_timeout`` for each other instead of
+failing at once.
+
+``retry_on_lock`` reruns a write view in a fresh transaction when SQLite
+still reports the database as locked after the busy timeout.
+"""
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+def retry_on_lock(func=None, attempts=None, backoff=0.05, using=None):
+    """
+    Run ``func`` in a transaction and retry it with jittered exponential
+    backoff while SQLite reports the database as locked. The whole function
+    is rerun, so its writes are all or nothing. Inside an enclosing
+    transaction the error is raised unchanged, because only the outermost
+    block can be retried.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            max_attempts = attempts or getattr(settings, 'SQLITE_LOCK_RETRIES', 3)
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as exc:
+                    nested = connections[using or DEFAULT_DB_ALIAS].in_atomic_block
+                    if not is_lock_error(exc) or nested or attempt == max_attempts:
+                        raise
+                    delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    logger.warning(
+                        'Database locked in %s, retrying in %.3fs (attempt %d/%d)',
+                        func.__qualname__, delay, attempt, max_attempts
+                    )
+                    time.sleep(delay)
+        return wrapper
+    return decorator(func) if func is not None else decorator
@@ -0,0 +1,89 @@
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+# Conditions shared by every per-assignee aggregate. A task counts as on time
+# when it was completed (last updated while DONE) on or before its due date.
+DONE = Q(status='DONE')
+ON_TIME = Q(status='DONE', due_date__gte=TruncDate('updated_at'))
+DELAYED = Q(status='DONE', due_date__lt=TruncDate('updated_at'))
+
+COUNTER_FIELDS = ('tasks_completed', 'tasks_on_time', 'tasks_delayed', 'efficiency')
+
+
+def calculate_efficiency(completed, on_time):
+    if not completed:
+        return 0
+    return round((on_time / completed) * 100, 1)
+
+
+def aggregate_tasks_by_assignee(tasks, timeliness=False):
+    """
+    Run one grouped query over ``tasks`` and return a dict keyed by
+    ``assigned_to_id`` with the status counts for that assignee. With
+    ``timeliness`` the on time / delayed split of completed tasks is included.
+    """
+    aggregates = {
+        'total': Count('id'),
+        'todo': Count('id', filter=Q(status='TODO')),
+        'in_progress': Count('id', filter=Q(status='IN_PROGRESS')),
+        'done': Count('id', filter=DONE),
+    }
+    if timeliness:
+        aggregates['on_time'] = Count('id', filter=ON_TIME)
+        aggregates['delayed'] = Count('id', filter=DELAYED)
+
+    rows = tasks.order_by().values('assigned_to').annotate(**aggregates)
+    return {row.pop('assigned_to'): row for row in rows}
+
+
+def summarize_task_stats(groups):
+    """Fold the per-assignee groups back into the global taskStats block."""
+    task_stats = {'todo': 0, 'in_progress': 0, 'done': 0}
+    for row in groups.values():
+        for key in task_stats:
+            task_stats[key] += row[key]
+    return task_stats
+
+
+def efficiency_entry(member, total_tasks):
+    """Build a teamEfficiency entry from a user's maintained counters."""
+    return {
+        'name': member['username'],
+        'tasksCompleted': member['tasks_completed'],
+        'totalTasks': total_tasks,
+        'efficiency': member['efficiency'],
+        'onTime': member['tasks_on_time'],
+        'delayed': member['tasks_delayed'],
+    }
+
+
+def read_member_counters(members):
+    return list(members.values('id', 'username', *COUNTER_FIELDS))
+
+
+def combine_dashboard_stats(groups, member_rows):
+    """Build taskStats and teamEfficiency from the two dashboard reads."""
+    team_efficiency = [
+        efficiency_entry(member, groups.get(member['id'], {}).get('total', 0))
+        for member in member_rows
+    ]
+    return summarize_task_stats(groups), team_efficiency
+
+
+def build_dashboard_stats(tasks, members):
+    """
+    Compute taskStats and teamEfficiency with a fixed number of queries: one
+    grouped status count over ``tasks`` and one read of the ``members``
+    performance counters (see ``project_api.counters``).
+    """
+    return combine_dashboard_stats(
+        aggregate_tasks_by_assignee(tasks), read_member_counters(members)
+    )
+
+
+def calculate_team_efficiency(tasks, members=None):
+    """teamEfficiency for every approved team member (or ``members``)."""
+    if members is None:
+        from .models import User
+        members = User.objects.filter(role='TEAM_MEMBER', is_approved=True)
+    return build_dashboard_stats(tasks, members)[1]
@@ -0,0 +1,51 @@
+"""
+Server-Sent Events endpoint.
+
+``event_stream`` is an async view: each open connection costs one coroutine
+and one ``events.Subscription`` rather than a worker thread, so it has to be
+served by an ASGI server (``uvicorn mysite.asgi:application`` or
+``daphne mysite.asgi:application``). Browsers' ``EventSource`` cannot send
+headers, so the access token is also accepted as ``?token=``.
+"""
+import asyncio
+
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .authentication import jwt_required
+from .events import bus, format_event, get_config
+
+
+async def stream_events(subscription, heartbeat_interval):
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat_interval)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ': heartbeat\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        bus.unsubscribe(subscription)
+
+
+@jwt_required(allow_query_token=True)
+async def event_stream(request):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    if 'wsgi.input' in request.META:
+        return JsonResponse(
+            {'error': 'The event stream requires an ASGI server'},
+            status=501
+        )
+
+    subscription = bus.subscribe(request.user.pk)
+    response = StreamingHttpResponse(
+        stream_events(subscription, get_config()['HEARTBEAT_INTERVAL']),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from project_api.authentication import tokens_for_user
+from project_api.models import Comment, Project, Task, User
+
+
+# Pool-thread reads would open a second connection to the test database
+@override_settings(ASYNC_CONCURRENT_READS=False)
+class AsyncParityTests(TestCase):
+    """The /api/async/ views return the same payloads as their sync counterparts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True, first_name='Mem')
+        cls.other = User.objects.create_user('other', is_approved=True)
+        User.objects.create_user('pending')
+        today = date.today()
+        for index in range(2):
+            project = Project.objects.create(
+                title=f'Project {index}', owner=cls.admin,
+                start_date=today, deadline=today + timedelta(days=30),
+            )
+            project.members.set([cls.member, cls.other] if index else [cls.other])
+            for number in range(7):
+                task = Task.objects.create(
+                    title=f'Task {index}.{number}', project=project,
+                    assigned_to=cls.member if number % 2 else cls.other,
+                    status=('TODO', 'IN_PROGRESS', 'DONE')[number % 3],
+                    due_date=today + timedelta(days=number - 3),
+                )
+                if number % 3 == 0:
+                    Comment.objects.create(task=task, author=cls.admin, content='Comment')
+
+    def setUp(self):
+        cache.clear()
+
+    def get_both(self, user, path):
+        headers = {'Authorization': f'Bearer {tokens_for_user(user).access_token}'}
+        sync_response = self.client.get(f'/api/{path}', headers=headers)
+        cache.clear()
+        async_response = async_to_sync(self.async_client.get)(f'/api/async/{path}', headers=headers)
+        self.assertEqual(sync_response.status_code, 200)
+        self.assertEqual(async_response.status_code, 200)
+        return sync_response.json(), async_response.json()
+
+    def assert_same_page(self, sync_page, async_page):
+        self.assertEqual(sync_page['count'], async_page['count'])
+        self.assertEqual(sync_page['next'] is None, async_page['next'] is None)
+        self.assertEqual(sync_page['previous'] is None, async_page['previous'] is None)
+        self.assertEqual(
+            sorted(sync_page['results'], key=lambda row: row['id']),
+            sorted(async_page['results'], key=lambda row: row['id']),
+        )
+
+    def test_dashboard_stats(self):
+        for user in (self.admin, self.member):
+            with self.subTest(user=user.username):
+                sync_payload, async_payload = self.get_both(user, 'dashboard/stats/')
+                self.assertEqual(sync_payload, async_payload)
+
+    def test_team_members(self):
+        sync_payload, async_payload = self.get_both(self.admin, 'team-members/')
+        self.assertEqual(len(sync_payload), 2)
+        self.assertEqual(sync_payload, async_payload)
+
+    def test_users_status(self):
+        sync_payload, async_payload = self.get_both(self.admin, 'users/status/')
+        self.assertEqual(len(sync_payload['pending_users']), 1)
+        self.assertEqual(sync_payload, async_payload)
+
+    def test_tasks(self):
+        for query in ('', '?fields=id,title', '?expand=assigned_to'):
+            with self.subTest(query=query):
+                self.assert_same_page(*self.get_both(self.member, f'tasks/{query}'))
+
+    def test_task_pages(self):
+        pages = [self.get_both(self.admin, f'tasks/{query}') for query in ('', '?page=2')]
+        self.assertIsNotNone(pages[0][1]['next'])
+        for sync_page, async_page in pages:
+            self.assertEqual(sync_page['count'], async_page['count'])
+            self.assertEqual(len(sync_page['results']), len(async_page['results']))
+        # Rows may fall on different pages, since the sync viewset does not
+        # order its queryset
+        self.assertEqual(
+            sorted((row for _, page in pages for row in page['results']), key=lambda row: row['id']),
+            sorted((row for page, _ in pages for row in page['results']), key=lambda row: row['id']),
+        )
+
+    def test_projects(self):
+        for user in (self.admin, self.member):
+            for query in ('', '?fields=id,title,completion_percentage'):
+                with self.subTest(user=user.username, query=query):
+                    self.assert_same_page(*self.get_both(user, f'projects/{query}'))
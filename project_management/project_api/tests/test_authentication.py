@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from project_api.authentication import tokens_for_user
+from project_api.models import Project, Task, User
+
+
+class CachedUserJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        self.member = User.objects.create_user('member', is_approved=True)
+
+    def headers(self, user):
+        return {'Authorization': f'Bearer {tokens_for_user(user).access_token}'}
+
+    def test_user_row_is_cached(self):
+        headers = self.headers(self.member)
+        self.client.get('/api/notifications/unread_count/', headers=headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/unread_count/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+    def test_role_change_is_not_served_from_token_claims(self):
+        headers = self.headers(self.admin)
+        self.assertEqual(self.client.get('/api/dashboard/cache-stats/', headers=headers).status_code, 200)
+        self.admin.role = 'TEAM_MEMBER'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.save()
+        self.assertEqual(self.client.get('/api/dashboard/cache-stats/', headers=headers).status_code, 403)
+
+    def test_uncached_user_is_read_from_the_database(self):
+        # As after a restart, or when another process made the change
+        headers = self.headers(self.admin)
+        User.objects.filter(pk=self.admin.pk).update(role='TEAM_MEMBER')
+        self.assertEqual(self.client.get('/api/dashboard/cache-stats/', headers=headers).status_code, 403)
+
+    def test_deleted_user(self):
+        headers = self.headers(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.delete()
+        self.assertEqual(self.client.get('/api/notifications/unread_count/', headers=headers).status_code, 401)
+
+    def test_assignee_can_update_task_status(self):
+        today = date.today()
+        project = Project.objects.create(
+            title='Project', owner=self.admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        task = Task.objects.create(title='Task', project=project, assigned_to=self.member, due_date=today)
+        response = self.client.patch(
+            f'/api/tasks/{task.pk}/update-status/', {'status': 'DONE'},
+            content_type='application/json', headers=self.headers(self.member),
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def user_row_reads(self, method, url, body):
+        headers = self.headers(self.admin)
+        self.client.get('/api/notifications/unread_count/', headers=headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, body, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 201)
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "project_api_user" WHERE' in query['sql']
+        ]
+
+    def test_serialized_acting_user_is_loaded_once(self):
+        today = date.today()
+        reads = self.user_row_reads('post', '/api/projects/', {
+            'title': 'Project', 'start_date': str(today), 'deadline': str(today + timedelta(days=7)),
+        })
+        self.assertEqual(len(reads), 1, reads)
+        project = Project.objects.get()
+        task = Task.objects.create(title='Task', project=project, assigned_to=self.admin)
+        reads = self.user_row_reads('post', '/api/comments/', {'task': task.pk, 'content': 'Hello'})
+        self.assertEqual(len(reads), 1, reads)
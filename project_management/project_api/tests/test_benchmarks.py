@@ -0,0 +1,192 @@
+"""
+Per-endpoint benchmarks against seeded datasets.
+
+Each dataset size in ``benchmark_budgets.json`` gets its own test class,
+seeded with ``project_api.seeding``. Every endpoint is requested once to warm
+up, then ``BENCHMARK_REPEAT`` more times with the cache cleared before each
+request, except for the rows of the authenticated users, which stay cached
+between a user's requests. The query count and the response size are
+compared with the budget for that size and endpoint, and the median wall
+time too when ``BENCHMARK_TIME_FACTOR`` is set.
+
+Environment variables:
+
+- ``BENCHMARK_SIZES``: comma separated sizes to run (default: the
+  ``default_sizes`` from the budgets file).
+- ``BENCHMARK_REPEAT``: measured requests per endpoint (default 3).
+- ``BENCHMARK_TIME_FACTOR``: check wall times against the time budgets
+  multiplied by this factor (e.g. 1, or more on slow machines). Unset by
+  default, since absolute times depend on the machine.
+- ``BENCHMARK_RESULTS``: write the JSON results to this path.
+"""
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+from unittest import skipUnless
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from project_api.authentication import USER_FIELDS, tokens_for_user, user_key
+from project_api.models import Notification, Project, Task, User
+from project_api.seeding import DEFAULT_PASSWORD, seed
+
+BUDGETS_PATH = Path(__file__).with_name('benchmark_budgets.json')
+BUDGETS = json.loads(BUDGETS_PATH.read_text())
+
+# (name, method, user, url, body). ``user`` is the attribute of the test
+# class to authenticate as, or None; urls and bodies are formatted with the
+# ids from ``BenchmarkMixin.url_context``.
+ENDPOINTS = [
+    ('login', 'post', None, '/api/login/', {'username': '{admin_name}', 'password': DEFAULT_PASSWORD}),
+    ('dashboard_stats_admin', 'get', 'admin', '/api/dashboard/stats/', None),
+    ('dashboard_stats_member', 'get', 'member', '/api/dashboard/stats/', None),
+    ('dashboard_timeline', 'get', 'admin', '/api/dashboard/timeline/', None),
+    ('project_list_admin', 'get', 'admin', '/api/projects/', None),
+    ('project_list_member', 'get', 'member', '/api/projects/', None),
+    ('project_detail', 'get', 'member', '/api/projects/{project}/', None),
+    ('task_list_admin', 'get', 'admin', '/api/tasks/', None),
+    ('task_list_member', 'get', 'member', '/api/tasks/', None),
+    ('task_detail', 'get', 'member', '/api/tasks/{task}/', None),
+    ('my_tasks', 'get', 'member', '/api/tasks/my-tasks/{member}/', None),
+    ('task_comments', 'get', 'member', '/api/tasks/{task}/comments/', None),
+    ('comment_list', 'get', 'member', '/api/comments/', None),
+    ('notification_list', 'get', 'member', '/api/notifications/', None),
+    ('unread_count', 'get', 'member', '/api/notifications/unread_count/', None),
+    ('team_members', 'get', 'admin', '/api/team-members/', None),
+    ('users_status', 'get', 'admin', '/api/users/status/', None),
+    ('search_admin', 'get', 'admin', '/api/search/?q=review', None),
+    ('search_member', 'get', 'member', '/api/search/?q=review', None),
+    ('async_dashboard_stats', 'get', 'admin', '/api/async/dashboard/stats/', None),
+    ('async_task_list', 'get', 'member', '/api/async/tasks/', None),
+    ('async_project_list', 'get', 'member', '/api/async/projects/', None),
+    ('task_update_status', 'patch', 'member', '/api/tasks/{task}/update-status/', {'status': 'DONE'}),
+    ('notification_mark_read', 'patch', 'member', '/api/notifications/{notification}/mark_read/', None),
+]
+
+RESULTS = {}
+
+
+def selected_sizes():
+    value = os.environ.get('BENCHMARK_SIZES')
+    return value.split(',') if value else BUDGETS['default_sizes']
+
+
+def tearDownModule():
+    path = os.environ.get('BENCHMARK_RESULTS')
+    if not RESULTS or not path:
+        return
+    Path(path).write_text(json.dumps({
+        'timestamp': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+        },
+        'repeat': int(os.environ.get('BENCHMARK_REPEAT', 3)),
+        'results': RESULTS,
+    }, indent=2) + '\n')
+
+
+class BenchmarkMixin:
+    size = None
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(**BUDGETS['sizes'][cls.size], prefix='bench')
+        cls.admin = User.objects.filter(role='ADMIN').order_by('pk').first()
+        cls.member = (
+            User.objects.filter(role='TEAM_MEMBER', is_approved=True, assigned_tasks__isnull=False)
+            .order_by('pk').first()
+        )
+        cls.task = Task.objects.filter(assigned_to=cls.member).order_by('pk').first()
+        cls.notification = Notification.objects.filter(user=cls.member).order_by('pk').first()
+        cls.url_context = {
+            'admin_name': cls.admin.username,
+            'member': cls.member.pk,
+            'project': Project.objects.visible_to(cls.member).order_by('pk').first().pk,
+            'task': cls.task.pk,
+            'notification': cls.notification.pk,
+        }
+        cls.tokens = {
+            'admin': str(tokens_for_user(cls.admin).access_token),
+            'member': str(tokens_for_user(cls.member).access_token),
+        }
+        cls.user_rows = {
+            user_key(row['id']): row
+            for row in User.objects.filter(pk__in=[cls.admin.pk, cls.member.pk]).values(*USER_FIELDS)
+        }
+
+    def request(self, method, user, url, body):
+        client = Client()
+        kwargs = {'headers': {}}
+        if user is not None:
+            kwargs['headers']['Authorization'] = f'Bearer {self.tokens[user]}'
+        if method != 'get':
+            kwargs.update(data=body, content_type='application/json')
+        cache.clear()
+        cache.set_many(self.user_rows)
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        return response, elapsed, len(queries)
+
+    def measure(self, method, user, url, body):
+        response, _, _ = self.request(method, user, url, body)
+        self.assertLess(response.status_code, 400, f'{url}: {response.content[:200]!r}')
+        timings, query_counts = [], []
+        for _ in range(int(os.environ.get('BENCHMARK_REPEAT', 3))):
+            response, elapsed, query_count = self.request(method, user, url, body)
+            timings.append(elapsed)
+            query_counts.append(query_count)
+        return {
+            'seconds': round(statistics.median(timings), 5),
+            'queries': max(query_counts),
+            'bytes': len(response.content),
+        }
+
+    def fill(self, value):
+        if isinstance(value, dict):
+            return {key: self.fill(item) for key, item in value.items()}
+        if isinstance(value, str):
+            return value.format(**self.url_context)
+        return value
+
+    def test_endpoints_within_budget(self):
+        budgets = BUDGETS['budgets'][self.size]
+        time_factor = os.environ.get('BENCHMARK_TIME_FACTOR')
+        results = RESULTS.setdefault(self.size, {})
+        for name, method, user, url, body in ENDPOINTS:
+            with self.subTest(endpoint=name):
+                result = self.measure(method, user, self.fill(url), self.fill(body))
+                results[name] = result
+                budget = budgets[name]
+                self.assertLessEqual(result['queries'], budget['queries'], f'{name}: query count')
+                self.assertLessEqual(result['bytes'], budget['bytes'], f'{name}: payload bytes')
+                if time_factor:
+                    self.assertLessEqual(
+                        result['seconds'], budget['seconds'] * float(time_factor), f'{name}: wall time'
+                    )
+
+
+def benchmark_class(size):
+    name = f'{size.title()}DatasetBenchmarks'
+    cls = type(name, (BenchmarkMixin, TestCase), {'size': size, '__module__': __name__})
+    # Reads on other threads would use another connection to the in-memory
+    # test database, which cannot see the uncommitted seed data
+    cls = override_settings(ASYNC_CONCURRENT_READS=False)(cls)
+    return skipUnless(size in selected_sizes(), f'BENCHMARK_SIZES does not include {size!r}')(cls)
+
+
+for _size in BUDGETS['sizes']:
+    globals()[f'{_size.title()}DatasetBenchmarks'] = benchmark_class(_size)
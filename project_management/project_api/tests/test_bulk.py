@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from project_api.models import Project, Task, User
+
+
+class BulkTaskTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.teammate = User.objects.create_user('teammate', is_approved=True)
+        cls.outsider = User.objects.create_user('outsider', is_approved=True)
+        today = date.today()
+        cls.project = Project.objects.create(
+            title='Project', owner=cls.admin, start_date=today, deadline=today + timedelta(days=30),
+        )
+        cls.project.members.set([cls.member, cls.teammate])
+        cls.other_project = Project.objects.create(
+            title='Other', owner=cls.admin, start_date=today, deadline=today + timedelta(days=30),
+        )
+        cls.own_task = Task.objects.create(
+            title='Own', project=cls.project, assigned_to=cls.member, due_date=today,
+        )
+        cls.teammate_task = Task.objects.create(
+            title='Teammate', project=cls.project, assigned_to=cls.teammate, due_date=today,
+        )
+        cls.outside_task = Task.objects.create(
+            title='Outside', project=cls.other_project, assigned_to=cls.member, due_date=today,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def post(self, user, action, body):
+        return self.client_for(user).post(f'/api/tasks/{action}/', body, format='json')
+
+    def test_bulk_create(self):
+        payload = [
+            {'title': f'Task {number}', 'project_id': self.project.pk,
+             'assigned_to_id': self.teammate.pk, 'due_date': str(date.today())}
+            for number in range(3)
+        ]
+        response = self.post(self.member, 'bulk_create', payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Task.objects.filter(assigned_to=self.teammate).count(), 4)
+
+    def test_bulk_create_checks_project_access(self):
+        payload = [{'title': 'Task', 'project_id': self.other_project.pk,
+                    'assigned_to_id': self.member.pk, 'due_date': str(date.today())}]
+        response = self.post(self.outsider, 'bulk_create', payload)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.post(self.member, 'bulk_create', {'title': 'Task'}).status_code, 400)
+
+    def test_bulk_status_of_own_tasks(self):
+        response = self.post(self.member, 'bulk_status', {'ids': [self.own_task.pk], 'status': 'DONE'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 1})
+        self.own_task.refresh_from_db()
+        self.assertEqual(self.own_task.status, 'DONE')
+
+    def test_bulk_status_of_someone_elses_task(self):
+        response = self.post(
+            self.member, 'bulk_status', {'ids': [self.own_task.pk, self.teammate_task.pk], 'status': 'DONE'}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['ids'], [self.teammate_task.pk])
+        self.assertFalse(Task.objects.filter(status='DONE').exists())
+
+    def test_bulk_reassign_of_own_task(self):
+        response = self.post(
+            self.member, 'bulk_reassign', {'ids': [self.own_task.pk], 'assigned_to_id': self.teammate.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.own_task.refresh_from_db()
+        self.assertEqual(self.own_task.assigned_to, self.teammate)
+
+    def test_bulk_reassign_of_someone_elses_task(self):
+        response = self.post(
+            self.member, 'bulk_reassign', {'ids': [self.teammate_task.pk], 'assigned_to_id': self.member.pk}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.teammate_task.refresh_from_db()
+        self.assertEqual(self.teammate_task.assigned_to, self.teammate)
+
+    def test_bulk_reassign_outside_the_users_projects(self):
+        response = self.post(
+            self.member, 'bulk_reassign', {'ids': [self.outside_task.pk], 'assigned_to_id': self.teammate.pk}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['ids'], [self.outside_task.pk])
+
+    def test_bulk_reassign_by_admin(self):
+        response = self.post(
+            self.admin, 'bulk_reassign',
+            {'ids': [self.own_task.pk, self.teammate_task.pk], 'assigned_to_id': self.outsider.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 2})
+        self.assertEqual(self.outsider.notifications.count(), 2)
+
+    def test_bulk_delete_needs_the_project_owner(self):
+        response = self.post(self.member, 'bulk_delete', {'ids': [self.own_task.pk]})
+        self.assertEqual(response.status_code, 403)
+        response = self.post(self.member, 'bulk_delete', {'ids': [self.teammate_task.pk]})
+        self.assertEqual(response.status_code, 404)
+        response = self.post(self.admin, 'bulk_delete', {'ids': [self.own_task.pk, self.teammate_task.pk]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_missing_tasks(self):
+        response = self.post(self.admin, 'bulk_delete', {'ids': [self.own_task.pk, 99999]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['ids'], [99999])
+
+    def test_invalid_bodies(self):
+        requests = [
+            ('bulk_status', [self.own_task.pk]),
+            ('bulk_status', {'ids': [self.own_task.pk], 'status': 'LATER'}),
+            ('bulk_status', {'ids': 'all', 'status': 'DONE'}),
+            ('bulk_reassign', [self.own_task.pk]),
+            ('bulk_reassign', {'ids': [self.own_task.pk], 'assigned_to_id': 'abc'}),
+            ('bulk_reassign', {'ids': [self.own_task.pk]}),
+            ('bulk_reassign', {'ids': ['abc'], 'assigned_to_id': self.member.pk}),
+            ('bulk_delete', [self.own_task.pk]),
+            ('bulk_delete', {'ids': []}),
+        ]
+        for action, body in requests:
+            with self.subTest(action=action, body=body):
+                self.assertEqual(self.post(self.admin, action, body).status_code, 400)
+
+    def test_reassign_to_missing_user(self):
+        response = self.post(
+            self.admin, 'bulk_reassign', {'ids': [self.own_task.pk], 'assigned_to_id': 99999}
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from project_api import cache as dashboard_cache
+from project_api.models import Project, Task, User
+
+
+class DashboardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.old_assignee = User.objects.create_user('old', is_approved=True)
+        cls.new_assignee = User.objects.create_user('new', is_approved=True)
+        cls.bystander = User.objects.create_user('bystander', is_approved=True)
+        today = date.today()
+        cls.project = Project.objects.create(
+            title='Project', owner=cls.admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        cls.task = Task.objects.create(title='Task', project=cls.project, assigned_to=cls.old_assignee)
+
+    def setUp(self):
+        cache.clear()
+        self.users = [self.admin, self.old_assignee, self.new_assignee, self.bystander]
+
+    def keys(self):
+        return {user.username: dashboard_cache.dashboard_key(user) for user in self.users}
+
+    def changed(self, before):
+        after = self.keys()
+        return {name for name in before if before[name] != after[name]}
+
+    def test_task_change_bumps_admin_and_both_assignees(self):
+        before = self.keys()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'DONE'
+            self.task.assigned_to = self.new_assignee
+            self.task.save()
+        self.assertEqual(self.changed(before), {'admin', 'old', 'new'})
+
+    def test_project_save_bumps_the_global_generation(self):
+        before = self.keys()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        self.assertEqual(self.changed(before), {'admin', 'old', 'new', 'bystander'})
+
+    def test_membership_change_bumps_the_global_generation(self):
+        for change in (
+            lambda: self.project.members.add(self.bystander),
+            lambda: self.project.members.remove(self.bystander),
+            lambda: self.project.members.clear(),
+        ):
+            before = self.keys()
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertEqual(self.changed(before), {'admin', 'old', 'new', 'bystander'})
+
+    def test_bumps_wait_for_commit(self):
+        before = self.keys()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.project.save()
+            self.assertEqual(self.changed(before), set())
+        self.assertTrue(callbacks)
+
+    def test_rolled_back_write_bumps_nothing(self):
+        before = self.keys()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.task.status = 'DONE'
+                    self.task.save()
+                    self.project.members.add(self.bystander)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.changed(before), set())
+
+    def test_hits_and_misses(self):
+        built = []
+
+        def builder(user):
+            built.append(user.pk)
+            return {'user': user.pk}
+
+        self.assertEqual(dashboard_cache.get_or_build(self.admin, builder), {'user': self.admin.pk})
+        self.assertEqual(dashboard_cache.get_or_build(self.admin, builder), {'user': self.admin.pk})
+        dashboard_cache.get_or_build(self.bystander, builder)
+        self.assertEqual(built, [self.admin.pk, self.bystander.pk])
+        self.assertEqual(dashboard_cache.stats(), {'hits': 1, 'misses': 2, 'hit_rate': 0.333})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            dashboard_cache.bump(dashboard_cache.ADMIN_SCOPE)
+        dashboard_cache.get_or_build(self.admin, builder)
+        dashboard_cache.get_or_build(self.bystander, builder)
+        self.assertEqual(len(built), 3)
+        self.assertEqual(dashboard_cache.stats(), {'hits': 2, 'misses': 3, 'hit_rate': 0.4})
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from project_api.models import Project, Task, User
+
+
+class CompletionPercentageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.members = [User.objects.create_user(f'member{index}', is_approved=True) for index in range(2)]
+        cls.projects = [cls.create_project(statuses) for statuses in (
+            [], ['DONE'], ['TODO', 'DONE', 'IN_PROGRESS'], ['TODO', 'TODO'],
+        )]
+
+    @classmethod
+    def create_project(cls, statuses):
+        today = date.today()
+        project = Project.objects.create(
+            title='Project', owner=cls.admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        # Members join the same query and must not inflate the task counts
+        project.members.set(cls.members)
+        for status in statuses:
+            Task.objects.create(title='Task', project=project, status=status, assigned_to=cls.members[0])
+        return project
+
+    def per_object(self):
+        return {project.pk: Project.objects.get(pk=project.pk).get_completion_percentage() for project in self.projects}
+
+    def test_annotation_matches_the_per_object_value(self):
+        expected = self.per_object()
+        self.assertEqual(expected, {
+            self.projects[0].pk: 0, self.projects[1].pk: 100,
+            self.projects[2].pk: 1 / 3 * 100, self.projects[3].pk: 0,
+        })
+        annotated = Project.objects.filter(members=self.members[0]).with_completion()
+        self.assertEqual({project.pk: project.get_completion_percentage() for project in annotated}, expected)
+        prefetched = Project.objects.prefetch_related('tasks')
+        self.assertEqual({project.pk: project.get_completion_percentage() for project in prefetched}, expected)
+
+    def list_projects(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/projects/?fields=id,completion_percentage')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'], len(queries)
+
+    def test_project_list_runs_a_fixed_number_of_queries(self):
+        results, queries = self.list_projects()
+        self.assertEqual({row['id']: row['completion_percentage'] for row in results}, self.per_object())
+        for statuses in (['DONE'], ['TODO', 'DONE']):
+            self.create_project(statuses)
+        results, more_queries = self.list_projects()
+        self.assertEqual(len(results), 6)
+        self.assertEqual(more_queries, queries)
@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from project_api.counters import rebuild_counters
+from project_api.models import Project, Task, User
+from project_api.stats import COUNTER_FIELDS
+
+
+class CounterMaintenanceTests(TestCase):
+    """
+    Every write path must leave the incrementally maintained counters equal
+    to a full rebuild from the Task table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.teammate = User.objects.create_user('teammate', is_approved=True)
+        today = date.today()
+        cls.project = Project.objects.create(
+            title='Project', owner=cls.admin, start_date=today, deadline=today + timedelta(days=30),
+        )
+        cls.project.members.set([cls.member, cls.teammate])
+        cls.tasks = [
+            Task.objects.create(
+                title=f'Task {index}', project=cls.project, status=status, due_date=due_date,
+                assigned_to=cls.member if index % 2 else cls.teammate,
+            )
+            for index, (status, due_date) in enumerate([
+                ('TODO', today), ('DONE', today), ('DONE', today - timedelta(days=3)),
+                ('IN_PROGRESS', today + timedelta(days=3)), ('DONE', None), ('TODO', today - timedelta(days=1)),
+            ])
+        ]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def counters(self):
+        return {
+            row.pop('id'): row
+            for row in User.objects.order_by('id').values('id', *COUNTER_FIELDS)
+        }
+
+    def assert_counters_match_rebuild(self):
+        maintained = self.counters()
+        rebuild_counters()
+        self.assertEqual(maintained, self.counters())
+
+    def test_created_tasks(self):
+        self.assertTrue(any(row['tasks_completed'] for row in self.counters().values()))
+        self.assert_counters_match_rebuild()
+
+    def test_update_status(self):
+        client = self.client_for(self.admin)
+        for task, new_status in zip(self.tasks, ['DONE', 'TODO', 'IN_PROGRESS', 'DONE', 'DONE', 'DONE']):
+            response = client.patch(f'/api/tasks/{task.pk}/update-status/', {'status': new_status}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assert_counters_match_rebuild()
+
+    def test_patch_reassign(self):
+        client = self.client_for(self.admin)
+        for task in self.tasks[:3]:
+            response = client.patch(f'/api/tasks/{task.pk}/', {'assigned_to_id': self.admin.pk}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(assigned_to=self.admin).count(), 3)
+        self.assert_counters_match_rebuild()
+
+    def test_destroy(self):
+        client = self.client_for(self.admin)
+        for task in self.tasks[1:3]:
+            self.assertEqual(client.delete(f'/api/tasks/{task.pk}/').status_code, 204)
+        self.assert_counters_match_rebuild()
+
+    def test_project_cascade_delete(self):
+        self.assertEqual(self.client_for(self.admin).delete(f'/api/projects/{self.project.pk}/').status_code, 204)
+        self.assertEqual(Task.objects.count(), 0)
+        self.assert_counters_match_rebuild()
+
+    def test_bulk_create(self):
+        payload = [
+            {'title': f'New {index}', 'project_id': self.project.pk, 'assigned_to_id': self.member.pk,
+             'status': 'DONE', 'due_date': str(date.today())}
+            for index in range(3)
+        ]
+        response = self.client_for(self.admin).post('/api/tasks/bulk_create/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.filter(status='DONE').count(), 6)
+        self.assert_counters_match_rebuild()
+
+    def test_bulk_status(self):
+        ids = [task.pk for task in self.tasks]
+        client = self.client_for(self.admin)
+        for new_status in ('DONE', 'IN_PROGRESS'):
+            response = client.post('/api/tasks/bulk_status/', {'ids': ids[:4], 'status': new_status}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assert_counters_match_rebuild()
+
+    def test_bulk_reassign(self):
+        ids = [task.pk for task in self.tasks]
+        response = self.client_for(self.admin).post(
+            '/api/tasks/bulk_reassign/', {'ids': ids, 'assigned_to_id': self.member.pk}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_counters_match_rebuild()
+
+    def test_bulk_delete(self):
+        ids = [task.pk for task in self.tasks[:3]]
+        response = self.client_for(self.admin).post('/api/tasks/bulk_delete/', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assert_counters_match_rebuild()
@@ -0,0 +1,59 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from project_api import events
+from project_api.events import RESYNC, EventBus, format_event
+from project_api.stream import stream_events
+
+EVENT = {'event': 'notification', 'data': {'id': 1}}
+
+
+def queued(subscription):
+    items = []
+    while not subscription.queue.empty():
+        items.append(subscription.queue.get_nowait())
+    return items
+
+
+class EventBusTests(SimpleTestCase):
+    async def test_fan_out_per_user(self):
+        bus = EventBus()
+        first, second = bus.subscribe(1), bus.subscribe(1)
+        other = bus.subscribe(2)
+        # publish() is called from sync views on other threads
+        await asyncio.to_thread(bus.publish, 1, EVENT)
+        await asyncio.sleep(0)
+        self.assertEqual(queued(first), [EVENT])
+        self.assertEqual(queued(second), [EVENT])
+        self.assertEqual(queued(other), [])
+        self.assertTrue(bus.has_subscribers([2]))
+        bus.unsubscribe(other)
+        self.assertFalse(bus.has_subscribers([2]))
+        self.assertTrue(bus.has_subscribers())
+
+    async def test_full_queue_is_replaced_by_resync(self):
+        bus = EventBus()
+        subscription = bus.subscribe(1, maxsize=2)
+        for _ in range(3):
+            bus.publish(1, EVENT)
+        await asyncio.sleep(0)
+        self.assertEqual(queued(subscription), [RESYNC])
+        self.assertEqual(subscription.dropped, 2)
+        # The client keeps receiving events after the resync
+        bus.publish(1, EVENT)
+        await asyncio.sleep(0)
+        self.assertEqual(queued(subscription), [EVENT])
+
+
+class StreamTests(SimpleTestCase):
+    async def test_heartbeat_events_and_unsubscribe(self):
+        subscription = events.bus.subscribe(42)
+        stream = stream_events(subscription, heartbeat_interval=0.01)
+        self.assertEqual(await anext(stream), 'retry: 5000\n\n')
+        self.assertEqual(await anext(stream), ': heartbeat\n\n')
+        events.bus.publish(42, EVENT)
+        self.assertEqual(await anext(stream), format_event(EVENT))
+        self.assertEqual(format_event(EVENT), 'event: notification\ndata: {"id": 1}\n\n')
+        await stream.aclose()
+        self.assertFalse(events.bus.has_subscribers([42]))
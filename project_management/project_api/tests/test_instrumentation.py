@@ -0,0 +1,79 @@
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from mysite import middleware as instrumentation
+from project_api.models import User
+
+
+def repeat_query(times):
+    def get_response(request):
+        for _ in range(times):
+            User.objects.filter(username='nobody').exists()
+        return HttpResponse('ok')
+    return get_response
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        instrumentation.stats.reset()
+        self.addCleanup(instrumentation.stats.reset)
+
+    def test_server_timing_header(self):
+        response = instrumentation.QueryInstrumentationMiddleware(repeat_query(1))(
+            RequestFactory().get('/')
+        )
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('app;dur=', response['Server-Timing'])
+        self.assertNotIn('dup;', response['Server-Timing'])
+
+    def test_duplicate_queries(self):
+        response = instrumentation.QueryInstrumentationMiddleware(repeat_query(3))(
+            RequestFactory().get('/')
+        )
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        self.assertIn('dup;desc="2 duplicate queries"', response['Server-Timing'])
+        row = instrumentation.view_stats()['<unresolved>']
+        self.assertEqual((row['requests'], row['queries'], row['duplicate_queries']), (1, 3, 2))
+
+    @override_settings(QUERY_INSTRUMENTATION={'SLOW_REQUEST_MS': 0})
+    def test_slow_requests_are_logged(self):
+        middleware = instrumentation.QueryInstrumentationMiddleware(repeat_query(2))
+        with self.assertLogs('mysite.requests', 'WARNING') as logs:
+            middleware(RequestFactory().get('/slow/'))
+        entry = logs.records[0].request_stats
+        self.assertEqual(json.loads(logs.records[0].getMessage()[len('slow request '):]), entry)
+        self.assertEqual(entry['path'], '/slow/')
+        self.assertEqual(entry['queries'], 2)
+        self.assertEqual(entry['duplicates'][0]['count'], 2)
+
+    def test_api_responses_are_instrumented(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('member', is_approved=True))
+        response = client.get('/api/notifications/unread_count/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertEqual(instrumentation.view_stats()['notification-unread-count']['requests'], 1)
+
+
+class ViewQueryStatsTests(TestCase):
+    def setUp(self):
+        instrumentation.stats.reset()
+        self.addCleanup(instrumentation.stats.reset)
+        self.client = APIClient()
+
+    def test_admins_only(self):
+        self.client.force_authenticate(User.objects.create_user('member', is_approved=True))
+        self.assertEqual(self.client.get('/api/stats/views/').status_code, 403)
+        self.assertEqual(self.client.delete('/api/stats/views/').status_code, 403)
+
+    def test_read_and_reset(self):
+        self.client.force_authenticate(User.objects.create_user('admin', role='ADMIN', is_approved=True))
+        self.client.get('/api/dashboard/cache-stats/')
+        response = self.client.get('/api/stats/views/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dashboard-cache-stats']['requests'], 1)
+        self.assertEqual(self.client.delete('/api/stats/views/').status_code, 204)
+        self.assertNotIn('dashboard-cache-stats', self.client.get('/api/stats/views/').data)
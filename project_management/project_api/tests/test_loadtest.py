@@ -0,0 +1,34 @@
+from django.test import TransactionTestCase, override_settings
+
+from project_api import loadtest
+from project_api.seeding import DEFAULT_PASSWORD, seed
+
+
+# The test runner only allows the 'testserver' host
+@override_settings(ALLOWED_HOSTS=['127.0.0.1'])
+class LoadTestSmokeTests(TransactionTestCase):
+    # The server threads open their own connections, so the seeded rows
+    # have to be committed
+    def test_run_against_wsgi(self):
+        seed(users=6, admins=1, projects=2, members_per_project=3, tasks=20, comments=20,
+             notifications=20)
+        users, member_ids = loadtest.load_users(3, 'load')
+        self.assertEqual(len(users), 3)
+
+        with loadtest.serve('wsgi') as port:
+            summary = loadtest.run(port, users, member_ids, DEFAULT_PASSWORD, 1)
+
+        # The shared-cache test database locks whole tables, so concurrent
+        # writes may fail; the run only has to get past the logins
+        self.assertIn('login', summary['endpoints'])
+        self.assertGreater(len(summary['endpoints']), 1)
+        self.assertLess(summary['errors'], summary['requests'])
+        self.assertEqual(
+            sum(row['requests'] for row in summary['endpoints'].values()), summary['requests']
+        )
+        for endpoint, row in [*summary['endpoints'].items(), ('total', summary)]:
+            with self.subTest(endpoint=endpoint):
+                self.assertGreater(row['requests'], 0)
+                self.assertLessEqual(0, row['p50_ms'])
+                self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+                self.assertLessEqual(row['p95_ms'], row['p99_ms'])
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.request import Request
+
+from project_api.membership import get_membership
+from project_api.models import Project, User
+
+
+class MembershipTests(TestCase):
+    # Queries a second request by the same user costs
+    later_request_queries = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.other = User.objects.create_user('other', is_approved=True)
+        cls.project = cls.create_project(cls.owner)
+        cls.project.members.set([cls.member])
+
+    @classmethod
+    def create_project(cls, owner):
+        today = date.today()
+        return Project.objects.create(
+            title='Project', owner=owner, start_date=today, deadline=today + timedelta(days=7),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_memoized_per_request(self):
+        request = self.request(self.member)
+        with self.assertNumQueries(1):
+            membership = get_membership(request)
+            # The DRF request shares the memo of the request it wraps
+            self.assertIs(get_membership(Request(request)), membership)
+        self.assertTrue(membership.is_member(self.project.pk))
+        self.assertFalse(membership.owns(self.project.pk))
+        self.assertTrue(get_membership(self.request(self.owner)).owns(self.project.pk))
+
+    def test_later_requests(self):
+        get_membership(self.request(self.member))
+        with self.assertNumQueries(self.later_request_queries):
+            get_membership(self.request(self.member))
+
+
+@override_settings(MEMBERSHIP_CACHE_TIMEOUT=60)
+class CachedMembershipTests(MembershipTests):
+    later_request_queries = 0
+
+    def visible(self, user):
+        return get_membership(self.request(user)).visible_ids
+
+    def change(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def test_members_add_remove_and_clear(self):
+        self.assertEqual(self.visible(self.other), set())
+        self.change(lambda: self.project.members.add(self.other))
+        self.assertEqual(self.visible(self.other), {self.project.pk})
+        self.change(lambda: self.project.members.remove(self.other))
+        self.assertEqual(self.visible(self.other), set())
+        self.assertEqual(self.visible(self.member), {self.project.pk})
+        self.change(lambda: self.project.members.clear())
+        self.assertEqual(self.visible(self.member), set())
+        # Changed from the user side
+        self.change(lambda: self.other.projects.add(self.project))
+        self.assertEqual(self.visible(self.other), {self.project.pk})
+
+    def test_project_create_delete_and_owner_change(self):
+        self.assertEqual(self.visible(self.other), set())
+        project = None
+
+        def create():
+            nonlocal project
+            project = self.create_project(self.other)
+        self.change(create)
+        self.assertEqual(self.visible(self.other), {project.pk})
+
+        self.change(lambda: Project.objects.filter(pk=project.pk).first().delete())
+        self.assertEqual(self.visible(self.other), set())
+
+        self.visible(self.owner)
+        self.project.owner = self.other
+        self.change(self.project.save)
+        self.assertEqual(self.visible(self.other), {self.project.pk})
+        self.assertEqual(self.visible(self.owner), set())
+
+        self.assertEqual(self.visible(self.member), {self.project.pk})
+        self.change(self.project.delete)
+        self.assertEqual(self.visible(self.member), set())
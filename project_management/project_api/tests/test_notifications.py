@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from project_api import notifications
+from project_api.counters import rebuild_counters
+from project_api.models import Notification, User
+
+
+class MarkReadTests(TestCase):
+    def setUp(self):
+        self.member = User.objects.create_user('member', is_approved=True)
+        self.other = User.objects.create_user('other', is_approved=True)
+        notifications.notify([self.member, self.member, self.other], type='task', title='Title', message='Message')
+        self.notification = Notification.objects.filter(user=self.member).first()
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def unread(self, user):
+        user.refresh_from_db(fields=['unread_notifications'])
+        return user.unread_notifications
+
+    def test_mark_read(self):
+        url = f'/api/notifications/{self.notification.pk}/mark_read/'
+        self.assertEqual(self.client.patch(url).status_code, 200)
+        self.assertEqual(self.client.patch(url).status_code, 200)
+        self.notification.refresh_from_db()
+        self.assertTrue(self.notification.is_read)
+        self.assertEqual(self.unread(self.member), 1)
+
+    def test_mark_all_read(self):
+        response = self.client.patch('/api/notifications/mark_all_read/')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(self.unread(self.member), 0)
+        self.assertEqual(self.unread(self.other), 1)
+
+    def test_rows_already_marked_read_are_not_counted_again(self):
+        # Two requests that both saw the notification unread
+        self.assertEqual(notifications.mark_read(self.member, pk=self.notification.pk), 1)
+        self.assertEqual(notifications.mark_read(self.member, pk=self.notification.pk), 0)
+        self.assertEqual(notifications.mark_read(self.member), 1)
+        self.assertEqual(self.unread(self.member), 0)
+
+    def test_other_users_notifications(self):
+        other = Notification.objects.get(user=self.other)
+        self.assertEqual(self.client.patch(f'/api/notifications/{other.pk}/mark_read/').status_code, 404)
+        self.assertEqual(notifications.mark_read(self.member, pk=other.pk), 0)
+        self.assertEqual(self.unread(self.other), 1)
+
+    def test_counter_out_of_step_does_not_go_negative(self):
+        # As for users whose counter predates the notifications it tracks
+        User.objects.filter(pk=self.member.pk).update(unread_notifications=0)
+        self.assertEqual(notifications.mark_read(self.member), 2)
+        self.assertEqual(self.unread(self.member), 0)
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').data['unread_count'], 0)
+
+    def test_rebuild_unread_only(self):
+        User.objects.update(unread_notifications=0, tasks_completed=5)
+        self.assertEqual(rebuild_counters(fields=['unread_notifications']), 2)
+        self.assertEqual(self.unread(self.member), 2)
+        self.assertEqual(self.unread(self.other), 1)
+        self.member.refresh_from_db(fields=['tasks_completed'])
+        self.assertEqual(self.member.tasks_completed, 5)
+
+
+@override_settings(NOTIFICATION_DISPATCH={'BACKGROUND': True, 'BUFFER_SIZE': 1, 'FLUSH_INTERVAL': 0.01})
+class BackgroundDispatchTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{index}', is_approved=True) for index in range(3)]
+
+    def unread(self):
+        return sorted(User.objects.values_list('unread_notifications', flat=True))
+
+    def test_rows_are_written_after_commit_and_drain(self):
+        with transaction.atomic():
+            notifications.notify(self.users[:1], type='task', title='Title', message='Message')
+            self.assertEqual(Notification.objects.count(), 0)
+        self.assertTrue(notifications.drain(timeout=5))
+        self.assertEqual(Notification.objects.get().user_id, self.users[0].pk)
+        self.assertEqual(self.unread(), [0, 0, 1])
+
+    def test_full_buffer_falls_back_to_a_synchronous_write(self):
+        dispatcher = notifications.get_dispatcher()
+        # Hold the worker back so that the one-slot buffer stays full
+        with mock.patch.object(dispatcher, '_ensure_worker'):
+            notifications.notify(self.users, type='task', title='Title', message='Message')
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)),
+            [user.pk for user in self.users[1:]],
+        )
+        dispatcher._ensure_worker()
+        self.assertTrue(notifications.drain(timeout=5))
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(self.unread(), [1, 1, 1])
@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from project_api.models import Comment, Notification, Project, Task, User
+from project_api.tests.test_query_plans import full_scans
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user('member', is_approved=True)
+        Notification.objects.bulk_create(
+            Notification(user=cls.member, title=f'N{index}', message='Message') for index in range(25)
+        )
+        # Most rows share a timestamp, which is where an offset-based cursor
+        # skips or repeats rows
+        for index, notification in enumerate(Notification.objects.order_by('id')):
+            created_at = START + timedelta(minutes=1 if 5 <= index < 20 else index)
+            Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        cls.expected = list(Notification.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, page):
+        return [row['id'] for row in page['results']]
+
+    def test_next_links_visit_every_row_once(self):
+        page = self.get('/api/notifications/?pagination=cursor&page_size=4')
+        self.assertIsNone(page['previous'])
+        seen = self.ids(page)
+        while page['next']:
+            page = self.get(page['next'])
+            seen += self.ids(page)
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_links_walk_back(self):
+        pages = [self.get('/api/notifications/?pagination=cursor&page_size=4')]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        page = pages[-1]
+        for earlier in reversed(pages[:-1]):
+            page = self.get(page['previous'])
+            self.assertEqual(self.ids(page), self.ids(earlier))
+        self.assertIsNone(page['previous'])
+        self.assertIsNotNone(page['next'])
+
+    def test_cursor_pages_do_not_scan(self):
+        page = self.get('/api/notifications/?pagination=cursor&page_size=4')
+        page = self.get(page['next'])
+        with CaptureQueriesContext(connection) as queries:
+            self.get(page['previous'])
+        for query in queries.captured_queries:
+            if query['sql'].startswith('SELECT'):
+                self.assertEqual(full_scans(query['sql']), [], query['sql'])
+
+    def test_invalid_cursor(self):
+        for cursor in ('abc', 'eyJwIjpbXX0=', 'eyJwIjpbIngiLCIxIl19'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f'/api/notifications/?cursor={cursor}').status_code, 404)
+
+
+class CommentFeedOrderingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        today = date.today()
+        project = Project.objects.create(
+            title='Project', owner=cls.admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        cls.task = Task.objects.create(title='Task', project=project, assigned_to=cls.admin)
+        Comment.objects.bulk_create(
+            Comment(task=cls.task, author=cls.admin, content=f'C{index}') for index in range(7)
+        )
+        for index, comment in enumerate(Comment.objects.order_by('id')):
+            Comment.objects.filter(pk=comment.pk).update(created_at=START + timedelta(minutes=index % 3))
+        cls.expected = list(Comment.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            page = self.client.get(url).data
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+        return ids
+
+    def test_page_and_cursor_modes_agree(self):
+        for base in (f'/api/tasks/{self.task.pk}/comments/', '/api/comments/'):
+            with self.subTest(base=base):
+                self.assertEqual(self.walk(f'{base}?page_size=3'), self.expected)
+                self.assertEqual(self.walk(f'{base}?pagination=cursor&page_size=3'), self.expected)
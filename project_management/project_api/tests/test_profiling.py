@@ -0,0 +1,124 @@
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.base import BaseHandler
+from django.test import AsyncClient, TestCase, override_settings
+
+from mysite import profiling
+from project_api.authentication import tokens_for_user
+from project_api.models import User
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.superuser = User.objects.create_superuser('root', 'root@example.com', 'password')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name) / 'profiles'
+        self.directory.mkdir()
+        self.settings = override_settings(REQUEST_PROFILING={'DIRECTORY': self.directory})
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def get(self, user, url, **headers):
+        headers['Authorization'] = f'Bearer {tokens_for_user(user).access_token}'
+        return self.client.get(url, headers=headers)
+
+    def saved(self):
+        return sorted(path.name for path in self.directory.glob('*.prof'))
+
+    def test_admin_header_profiles_the_view(self):
+        response = self.get(self.admin, '/api/dashboard/cache-stats/', **{'X-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.saved(), [response['X-Profile-Id']])
+        self.assertIn('ms ', response['X-Profile-Summary'])
+
+    def test_admin_query_flag(self):
+        response = self.get(self.admin, '/api/dashboard/cache-stats/?profile=1')
+        self.assertIn('X-Profile-Id', response)
+        response = self.get(self.admin, '/api/dashboard/cache-stats/?profile=0')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(len(self.saved()), 1)
+
+    def test_non_admins_cannot_ask_for_profiles(self):
+        for user in (self.member, self.superuser):
+            with self.subTest(user=user.username):
+                response = self.get(user, '/api/notifications/unread_count/', **{'X-Profile': '1'})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get('/api/notifications/unread_count/', headers={'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.saved(), [])
+
+    def test_sampled_views(self):
+        with override_settings(REQUEST_PROFILING={
+            'DIRECTORY': self.directory, 'SAMPLE_RATES': {'notification-unread-count': 1},
+        }):
+            response = self.get(self.member, '/api/notifications/unread_count/')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(len(self.saved()), 1)
+
+    def test_list_detail_and_download(self):
+        profile_id = self.get(self.admin, '/api/dashboard/cache-stats/?profile=1')['X-Profile-Id']
+        self.assertEqual(self.get(self.admin, '/api/profiles/').json(), [profile_id])
+        detail = self.get(self.admin, f'/api/profiles/{profile_id}/?top=3').json()
+        self.assertEqual(detail['id'], profile_id)
+        self.assertLessEqual(len(detail['functions']), 3)
+        download = self.get(self.admin, f'/api/profiles/{profile_id}/?download=1')
+        self.assertEqual(b''.join(download.streaming_content), (self.directory / profile_id).read_bytes())
+
+    def test_profiles_are_admin_only(self):
+        profile_id = self.get(self.admin, '/api/dashboard/cache-stats/?profile=1')['X-Profile-Id']
+        for user in (self.member, self.superuser):
+            with self.subTest(user=user.username):
+                self.assertEqual(self.get(user, '/api/profiles/').status_code, 403)
+                self.assertEqual(self.get(user, f'/api/profiles/{profile_id}/').status_code, 403)
+
+    def test_profile_ids_are_validated(self):
+        (self.directory.parent / 'outside.prof').write_bytes(b'')
+        (self.directory / 'notes.txt').write_text('not a profile')
+        for profile_id in ('../outside.prof', 'notes.txt', '', 'missing.prof'):
+            with self.subTest(profile_id=profile_id):
+                self.assertIsNone(profiling.profile_path(profile_id))
+        for profile_id in ('notes.txt', 'missing.prof', '..%2Foutside.prof'):
+            with self.subTest(profile_id=profile_id):
+                for query in ('', '?download=1'):
+                    response = self.get(self.admin, f'/api/profiles/{profile_id}/{query}')
+                    self.assertEqual(response.status_code, 404)
+
+    def test_async_middleware_chain_is_not_adapted(self):
+        handler = BaseHandler()
+        handler.load_middleware(is_async=True)
+        hooks = [
+            hook for hook in handler._view_middleware
+            if isinstance(getattr(hook, '__self__', None), profiling.ProfilingMiddleware)
+        ]
+        self.assertEqual(len(hooks), 1)
+        self.assertTrue(iscoroutinefunction(hooks[0]))
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    # Pool-thread reads would open a second connection to the test database
+    @override_settings(ASYNC_CONCURRENT_READS=False)
+    async def test_profiling_under_asgi(self):
+        client = AsyncClient()
+        admin, member = [
+            {'Authorization': f'Bearer {token.access_token}', 'X-Profile': '1'}
+            for token in [await sync_to_async(tokens_for_user)(user) for user in (self.admin, self.member)]
+        ]
+        response = await client.get('/api/dashboard/cache-stats/', headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Profile-Id', response)
+        # Coroutine views and non-admins are not profiled
+        response = await client.get('/api/async/team-members/', headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        response = await client.get('/api/notifications/unread_count/', headers=member)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(len(self.saved()), 1)
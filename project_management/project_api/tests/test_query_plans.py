@@ -0,0 +1,114 @@
+import re
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from project_api.models import Comment, Notification, Project, Task, User
+
+# Tables that grow with usage. "SCAN <table>" on one of them means SQLite
+# walks the whole table (or a whole index of it) because no index matches
+# the filter.
+LARGE_TABLES = {
+    'project_api_task',
+    'project_api_project',
+    'project_api_project_members',
+    'project_api_comment',
+    'project_api_notification',
+}
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$')
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(sql):
+    plan = query_plan(sql)
+    # Walking an index in ORDER BY order is fine when a LIMIT stops it early
+    bounded = ' LIMIT ' in sql and 'USE TEMP B-TREE FOR ORDER BY' not in plan
+    return [
+        detail for detail in plan
+        if (match := FULL_SCAN.search(detail))
+        and match.group(1) in LARGE_TABLES
+        and not (bounded and 'USING' in detail)
+    ]
+
+
+class QueryPlanTests(TestCase):
+    """
+    Runs each hot endpoint, then EXPLAINs every SELECT it issued and fails
+    if any of them falls back to a full scan of a large table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.other = User.objects.create_user('other', is_approved=True)
+        today = date.today()
+        for index in range(3):
+            project = Project.objects.create(
+                title=f'Project {index}', owner=cls.admin,
+                start_date=today, deadline=today + timedelta(days=30),
+            )
+            project.members.set([cls.member, cls.other])
+            for offset in range(5):
+                task = Task.objects.create(
+                    title=f'Task {index}-{offset}', project=project,
+                    assigned_to=cls.member if offset % 2 else cls.other,
+                    status=['TODO', 'IN_PROGRESS', 'DONE'][offset % 3],
+                    due_date=today + timedelta(days=offset),
+                )
+                Comment.objects.create(task=task, author=cls.member, content='Looks good')
+            Notification.objects.create(user=cls.member, title='New Project', message='Added')
+
+    def setUp(self):
+        # Cached dashboard payloads would hide the queries under test
+        cache.clear()
+
+    def assertNoFullScans(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            self.assertEqual(full_scans(sql), [], f'{url} ran a full table scan:\n{sql}')
+
+    def test_member_task_list(self):
+        self.assertNoFullScans(self.member, '/api/tasks/')
+        self.assertNoFullScans(self.member, '/api/tasks/?pagination=cursor')
+
+    def test_member_project_list(self):
+        self.assertNoFullScans(self.member, '/api/projects/')
+
+    def test_member_dashboard(self):
+        self.assertNoFullScans(self.member, '/api/dashboard/stats/')
+
+    def test_timeline_window(self):
+        window = f'?start={date.today()}&end={date.today() + timedelta(days=2)}'
+        self.assertNoFullScans(self.member, f'/api/dashboard/timeline/{window}')
+        self.assertNoFullScans(self.admin, f'/api/dashboard/timeline/{window}')
+
+    def test_admin_task_cursor_listing(self):
+        self.assertNoFullScans(self.admin, '/api/tasks/?pagination=cursor')
+
+    def test_notifications(self):
+        self.assertNoFullScans(self.member, '/api/notifications/')
+        self.assertNoFullScans(self.member, '/api/notifications/?pagination=cursor')
+        self.assertNoFullScans(self.member, '/api/notifications/unread_count/')
+
+    def test_comments(self):
+        task = Task.objects.filter(assigned_to=self.member).first()
+        self.assertNoFullScans(self.member, '/api/comments/')
+        self.assertNoFullScans(self.member, f'/api/tasks/{task.pk}/comments/')
+        self.assertNoFullScans(self.member, f'/api/tasks/{task.pk}/comments/?pagination=cursor')
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from project_api import replica
+from project_api.models import Project, Task, User
+from project_api.replica import REPLICA_DB_ALIAS, backup_to
+from project_api.routers import reporting
+
+
+@override_settings(REPLICA={'ENABLED': True, 'REFRESH_INTERVAL': 0})
+class ReplicaRouterTests(TransactionTestCase):
+    """
+    The replica alias mirrors the default test database, so these tests
+    check where queries are routed rather than what the copy contains.
+    """
+    databases = {'default', REPLICA_DB_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        today = date.today()
+        self.project = Project.objects.create(
+            title='Project', owner=self.admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        self.task = Task.objects.create(
+            title='Task', project=self.project, assigned_to=self.admin, due_date=today,
+        )
+
+    def test_reads_use_the_replica_only_when_reporting(self):
+        self.assertEqual(Task.objects.all().db, 'default')
+        with reporting():
+            self.assertEqual(Task.objects.all().db, REPLICA_DB_ALIAS)
+
+    def test_disabled_replica_is_not_used(self):
+        with override_settings(REPLICA={'ENABLED': False}), reporting():
+            self.assertEqual(Task.objects.all().db, 'default')
+
+    def test_reads_after_a_write_use_default(self):
+        with reporting():
+            task = Task.objects.get(pk=self.task.pk)
+            self.assertEqual(task._state.db, REPLICA_DB_ALIAS)
+            task.status = 'DONE'
+            with CaptureQueriesContext(connections['default']) as queries:
+                task.save()
+            self.assertTrue(any(q['sql'].startswith('UPDATE') for q in queries))
+            self.assertEqual(Task.objects.all().db, 'default')
+
+    def test_reads_inside_a_transaction_use_default(self):
+        with reporting(), transaction.atomic():
+            self.assertEqual(Task.objects.all().db, 'default')
+
+    def replica_queries(self, url):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return queries.captured_queries
+
+    def test_timeline_reads_from_the_replica(self):
+        self.assertTrue(self.replica_queries('/api/dashboard/timeline/'))
+
+    def test_cached_dashboard_does_not_read_from_the_replica(self):
+        self.assertFalse(self.replica_queries('/api/dashboard/stats/'))
+
+    @mock.patch.object(replica, '_refreshed_at', None)
+    @mock.patch.object(replica, 'is_mirror', return_value=False)
+    @mock.patch.object(replica, 'backup_to')
+    def test_requests_do_not_wait_for_the_first_copy(self, backup, is_mirror):
+        with reporting():
+            self.assertEqual(Task.objects.all().db, 'default')
+        backup.assert_not_called()
+        replica._refresh_periodically(0)
+        backup.assert_called_once()
+        with reporting():
+            self.assertEqual(Task.objects.all().db, REPLICA_DB_ALIAS)
+
+
+class BackupTests(TransactionTestCase):
+    def setUp(self):
+        User.objects.create_user('member')
+
+    def assert_copied(self, target):
+        count = target.execute('SELECT COUNT(*) FROM project_api_user').fetchone()[0]
+        self.assertEqual(count, User.objects.count())
+
+    def test_backup_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            backup_to(path)
+            target = sqlite3.connect(path)
+            try:
+                self.assert_copied(target)
+            finally:
+                target.close()
+
+    def test_backup_to_memory(self):
+        name = 'file:replica_backup_test?mode=memory&cache=shared'
+        backup_to(name)
+        # The copy outlives the connection that made it
+        target = sqlite3.connect(name, uri=True)
+        try:
+            self.assert_copied(target)
+        finally:
+            target.close()
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from project_api import search
+from project_api.models import Comment, Project, Task, User
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.other_admin = User.objects.create_user('other_admin', role='ADMIN', is_approved=True)
+        cls.member = User.objects.create_user('member', is_approved=True)
+        cls.teammate = User.objects.create_user('teammate', is_approved=True)
+        today = date.today()
+        cls.project = Project.objects.create(
+            title='Billing revamp', description='Invoices & <b>exports</b>', owner=cls.admin,
+            start_date=today, deadline=today + timedelta(days=7),
+        )
+        cls.project.members.set([cls.member, cls.teammate])
+        cls.outside = Project.objects.create(
+            title='Secret billing', owner=cls.other_admin, start_date=today, deadline=today + timedelta(days=7),
+        )
+        cls.own_task = Task.objects.create(
+            title='Fix invoice export', description='billing CSV broken', project=cls.project, assigned_to=cls.member,
+        )
+        cls.teammate_task = Task.objects.create(title='Invoice PDFs', project=cls.project, assigned_to=cls.teammate)
+        cls.outside_task = Task.objects.create(title='Invoice secret', project=cls.outside, assigned_to=cls.teammate)
+        cls.comment = Comment.objects.create(
+            task=cls.teammate_task, author=cls.teammate, content='The invoices look wrong',
+        )
+        cls.outside_comment = Comment.objects.create(
+            task=cls.outside_task, author=cls.teammate, content='invoice secret comment',
+        )
+
+    def search(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get('/api/search/', params)
+
+    def found(self, user, query, **params):
+        response = self.search(user, q=query, **params)
+        self.assertEqual(response.status_code, 200)
+        return {(result['type'], result['id']) for result in response.data['results']}
+
+    def test_member_sees_own_tasks_and_their_projects(self):
+        self.assertEqual(self.found(self.member, 'invoic'), {
+            ('project', self.project.pk),
+            ('task', self.own_task.pk),
+            ('comment', self.comment.pk),
+        })
+
+    def test_member_does_not_see_other_tasks_or_outside_comments(self):
+        found = self.found(self.member, 'invoice secret pdfs')
+        self.assertEqual(found, set())
+        found = self.found(self.member, 'secret')
+        self.assertNotIn(('comment', self.outside_comment.pk), found)
+        self.assertNotIn(('task', self.outside_task.pk), found)
+        self.assertNotIn(('project', self.outside.pk), found)
+
+    def test_admin_sees_every_task(self):
+        found = self.found(self.admin, 'invoice', type='task')
+        self.assertEqual(found, {
+            ('task', self.own_task.pk), ('task', self.teammate_task.pk), ('task', self.outside_task.pk),
+        })
+        # Projects and comments still follow project visibility
+        self.assertNotIn(('comment', self.outside_comment.pk), self.found(self.admin, 'secret'))
+
+    def test_ranking_and_snippets(self):
+        response = self.search(self.admin, q='billing', type='project,task')
+        first = response.data['results'][0]
+        self.assertEqual((first['type'], first['id']), ('project', self.project.pk))
+        response = self.search(self.member, q='exports', type='project')
+        self.assertIn('&lt;b&gt;<mark>exports</mark>&lt;/b&gt;', response.data['results'][0]['snippet'])
+
+    def test_invalid_parameters(self):
+        for params in ({'q': '  '}, {'q': 'x', 'type': 'user'}, {'q': 'x', 'limit': 'ten'}, {'q': 'x', 'offset': -1}):
+            with self.subTest(params=params):
+                self.assertEqual(self.search(self.member, **params).status_code, 400)
+        self.assertEqual(self.search(self.member, q='AND OR "').status_code, 200)
+
+    def test_edits_and_reassignment_are_indexed(self):
+        self.own_task.title = 'Renamed zebra'
+        self.own_task.save()
+        self.assertEqual(self.found(self.member, 'zebra'), {('task', self.own_task.pk)})
+        self.own_task.assigned_to = self.teammate
+        self.own_task.save()
+        self.assertEqual(self.found(self.member, 'zebra'), set())
+        self.assertEqual(self.found(self.teammate, 'zebra'), {('task', self.own_task.pk)})
+
+    def test_moving_a_task_moves_its_comments(self):
+        self.assertEqual(self.found(self.member, 'secret', type='comment'), set())
+        self.outside_task.project = self.project
+        self.outside_task.save()
+        self.assertEqual(self.found(self.member, 'secret', type='comment'), {('comment', self.outside_comment.pk)})
+
+    def test_deletes_are_indexed(self):
+        self.comment.delete()
+        self.assertNotIn(('comment', self.comment.pk), self.found(self.admin, 'invoices'))
+        self.own_task.delete()
+        self.assertNotIn(('task', self.own_task.pk), self.found(self.admin, 'invoice'))
+        self.outside.delete()
+        self.assertEqual(self.found(self.other_admin, 'secret'), set())
+        self.assertEqual(self.index_size(), 2)
+
+    def index_size(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {search.TABLE}')
+            return cursor.fetchone()[0]
+
+    def test_rebuild_search_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.TABLE}')
+        self.assertEqual(self.found(self.admin, 'invoice'), set())
+        stdout = StringIO()
+        call_command('rebuild_search_index', stdout=stdout)
+        self.assertIn('Indexed 7', stdout.getvalue())
+        self.assertEqual(self.index_size(), 7)
+        self.assertEqual(self.found(self.member, 'invoic'), {
+            ('project', self.project.pk), ('task', self.own_task.pk), ('comment', self.comment.pk),
+        })
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from project_api.models import Comment, Notification, Task
+from project_api.seeding import seed
+
+SIZES = {'users': 12, 'admins': 2, 'projects': 4, 'members_per_project': 3, 'tasks': 40,
+         'comments': 60, 'notifications': 30}
+
+
+class SeedTests(TestCase):
+    def generated(self, prefix, **kwargs):
+        seed(**SIZES, prefix=prefix, **kwargs)
+        tasks = Task.objects.filter(project__owner__username__startswith=prefix).order_by('pk')
+        comments = Comment.objects.filter(task__in=tasks).order_by('pk')
+        notifications = Notification.objects.filter(user__username__startswith=prefix).order_by('pk')
+        return (
+            list(tasks.values_list('title', 'status', 'priority', 'due_date', 'created_at', 'updated_at')),
+            list(comments.values_list('content', 'created_at')),
+            list(notifications.values_list('title', 'is_read', 'created_at')),
+        )
+
+    def test_same_seed_same_rows(self):
+        self.assertEqual(self.generated('first'), self.generated('second'))
+
+    def test_now_only_moves_timestamps(self):
+        default = self.generated('first')
+        later = self.generated('second', now=datetime(2027, 1, 1, tzinfo=timezone.utc))
+        self.assertNotEqual(default, later)
+        self.assertEqual(
+            [row[:3] for row in default[0]], [row[:3] for row in later[0]]
+        )
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from project_api.models import Comment, Project, Task, User
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        cls.members = [User.objects.create_user(f'member{index}', is_approved=True) for index in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_projects(self, count):
+        today = date.today()
+        for _ in range(count):
+            project = Project.objects.create(
+                title='Project', owner=self.admin, start_date=today, deadline=today + timedelta(days=7),
+            )
+            project.members.set(self.members)
+            for member in self.members:
+                task = Task.objects.create(title='Task', project=project, assigned_to=member)
+                Comment.objects.create(task=task, author=member, content='Comment')
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_fields(self):
+        self.add_projects(1)
+        self.assertEqual(set(self.get('/api/tasks/?fields=id,title')[0]), {'id', 'title'})
+        self.assertEqual(set(self.get('/api/projects/?fields=id,completion_percentage')[0]),
+                         {'id', 'completion_percentage'})
+
+    def test_expand(self):
+        self.add_projects(1)
+        task = self.get('/api/tasks/?expand=')[0]
+        self.assertIsInstance(task['assigned_to'], int)
+        task = self.get('/api/tasks/?expand=assigned_to')[0]
+        self.assertIn(task['assigned_to']['username'], [user.username for user in self.members])
+
+        project = self.get('/api/projects/?expand=owner')[0]
+        self.assertEqual(project['owner']['id'], self.admin.pk)
+        self.assertEqual(sorted(project['members']), sorted(user.pk for user in self.members))
+        # Collapsed to nothing rather than to a list of ids
+        self.assertNotIn('tasks', project)
+
+    def test_full_representation_by_default(self):
+        self.add_projects(1)
+        project = self.get('/api/projects/')[0]
+        self.assertEqual(len(project['tasks']), 3)
+        self.assertEqual(project['tasks'][0]['comment_count'], 1)
+        self.assertIn('username', project['members'][0])
+
+    def query_count(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.get(url)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        urls = [
+            '/api/projects/', '/api/projects/?expand=owner', '/api/projects/?fields=id,title',
+            '/api/tasks/', '/api/tasks/?expand=', '/api/tasks/?fields=id,project_title',
+        ]
+        self.add_projects(1)
+        small = [self.query_count(url) for url in urls]
+        self.add_projects(2)
+        self.assertEqual([self.query_count(url) for url in urls], small)
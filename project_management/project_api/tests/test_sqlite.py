@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from project_api.sqlite import retry_on_lock
+
+# The test database is in memory, where WAL does not apply; these tests
+# open their own connections to a database file instead
+LOCKING_PRAGMAS = {'journal_mode': 'delete', 'busy_timeout': 200}
+
+
+class SQLiteConcurrencyTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'concurrency.sqlite3')
+        self.connections = []
+        self.addCleanup(self.close_connections)
+
+        with sqlite3.connect(self.path) as setup:
+            setup.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, value TEXT)')
+            setup.execute("INSERT INTO item (value) VALUES ('committed')")
+        setup.close()
+
+    def close_connections(self):
+        for wrapper in self.connections:
+            wrapper.close()
+
+    def connect(self, pragmas=None, keep=True):
+        settings_dict = {**connection.settings_dict, 'NAME': self.path}
+        wrapper = DatabaseWrapper(settings_dict, alias='concurrency')
+        with override_settings(SQLITE_PRAGMAS=pragmas or settings.SQLITE_PRAGMAS):
+            wrapper.ensure_connection()
+        if keep:
+            self.connections.append(wrapper)
+        return wrapper
+
+    def hold_write_lock(self, writer):
+        """Start an uncommitted write that holds the database lock."""
+        cursor = writer.cursor()
+        cursor.execute('BEGIN EXCLUSIVE')
+        cursor.execute("INSERT INTO item (value) VALUES ('pending')")
+        self.addCleanup(writer.connection.rollback)
+
+    def read_values(self, reader):
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT value FROM item ORDER BY id')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_pragmas_are_applied(self):
+        with self.connect().cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_reader_blocks_behind_writer_without_wal(self):
+        writer = self.connect(LOCKING_PRAGMAS)
+        reader = self.connect(LOCKING_PRAGMAS)
+        self.hold_write_lock(writer)
+
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            self.read_values(reader)
+
+    def test_readers_do_not_block_behind_writer(self):
+        writer = self.connect()
+        self.hold_write_lock(writer)
+
+        latencies, results, errors = [], [], []
+
+        def read():
+            # Connections belong to the thread that opened them
+            reader = self.connect(keep=False)
+            try:
+                start = time.perf_counter()
+                results.append(self.read_values(reader))
+                latencies.append(time.perf_counter() - start)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                reader.close()
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # Readers see the last committed snapshot straight away
+        self.assertEqual(results, [['committed']] * 4)
+        self.assertLess(max(latencies), 0.1)
+
+
+class RetryOnLockTests(TransactionTestCase):
+    def test_retries_lock_errors(self):
+        calls = []
+
+        @retry_on_lock(backoff=0)
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'done'
+
+        with self.assertLogs('project_api.sqlite', 'WARNING') as logs:
+            self.assertEqual(write(), 'done')
+        self.assertEqual(calls, [True, True, True])
+        self.assertEqual(len(logs.output), 2)
+
+    def test_gives_up_after_the_last_attempt(self):
+        @retry_on_lock(attempts=2, backoff=0)
+        def write():
+            raise OperationalError('database is locked')
+
+        with self.assertLogs('project_api.sqlite', 'WARNING'), self.assertRaises(OperationalError):
+            write()
+
+    def test_other_errors_and_nested_calls_are_not_retried(self):
+        calls = []
+
+        @retry_on_lock(backoff=0)
+        def write(message):
+            calls.append(message)
+            raise OperationalError(message)
+
+        with self.assertRaises(OperationalError):
+            write('no such table: item')
+        with transaction.atomic(), self.assertRaises(OperationalError):
+            write('database is locked')
+        self.assertEqual(calls, ['no such table: item', 'database is locked'])
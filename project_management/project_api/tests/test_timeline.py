@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from project_api.models import Project, Task, User
+
+
+class DashboardTimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', role='ADMIN', is_approved=True)
+        today = date.today()
+        cls.projects = [
+            Project.objects.create(
+                title=f'Project {number}', owner=cls.admin, start_date=today, deadline=today + timedelta(days=7),
+            )
+            for number in range(2)
+        ]
+        for project in cls.projects:
+            Task.objects.create(title=project.title, project=project, assigned_to=cls.admin, due_date=today)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_project_filter(self):
+        response = self.client.get('/api/dashboard/timeline/', {'project': self.projects[1].pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['project'] for row in response.data['data']], ['Project 1'])
+
+    def test_invalid_parameters(self):
+        for params in ({'project': 'abc'}, {'limit': 'ten'}, {'start': '2025-13-01'}, {'cursor': 'abc'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/dashboard/timeline/', params).status_code, 400)
@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from project_api.authentication import tokens_for_user
+from project_api.models import User
+from project_api.tokens import RefreshToken, prune_expired_tokens, revoked
+
+BLACKLIST_TABLE = BlacklistedToken._meta.db_table
+
+
+@override_settings(TOKEN_REVOCATION={'REFRESH_INTERVAL': 60, 'REBUILD_INTERVAL': 3600})
+class RevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revoked.reset()
+        self.addCleanup(revoked.reset)
+        self.member = User.objects.create_user('member', is_approved=True)
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, content_type='application/json')
+
+    def test_blacklisted_token_is_rejected(self):
+        token = tokens_for_user(self.member)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            RefreshToken(str(token)).blacklist()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_unrevoked_token_is_checked_without_a_blacklist_query(self):
+        token = tokens_for_user(self.member)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.refresh(token).status_code, 200)
+        self.assertEqual([q['sql'] for q in queries if BLACKLIST_TABLE in q['sql']], [])
+
+    def test_blacklist_rows_from_other_processes_are_seen_after_the_interval(self):
+        token = tokens_for_user(self.member)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        # Written without going through RefreshToken.blacklist(), as another
+        # process would
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertEqual(self.refresh(token).status_code, 200)
+        later = time.monotonic() + 60
+        with mock.patch('project_api.tokens.time.monotonic', return_value=later):
+            self.assertEqual(self.refresh(token).status_code, 401)
+
+
+class PruneTokensTests(TestCase):
+    def setUp(self):
+        revoked.reset()
+        self.addCleanup(revoked.reset)
+        user = User.objects.create_user('member')
+        now = aware_utcnow()
+        for index in range(7):
+            expired = index < 5
+            token = OutstandingToken.objects.create(
+                user=user, jti=f'jti-{index}', token=f'token-{index}', created_at=now - timedelta(days=2),
+                expires_at=now + timedelta(days=-1 if expired else 1),
+            )
+            if index % 2:
+                BlacklistedToken.objects.create(token=token)
+
+    def test_prunes_only_expired_tokens_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(prune_expired_tokens(batch_size=2), 5)
+        self.assertEqual(
+            sorted(OutstandingToken.objects.values_list('jti', flat=True)), ['jti-5', 'jti-6'],
+        )
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token__jti', flat=True)), ['jti-5'])
+        deletes = [
+            q['sql'] for q in queries
+            if q['sql'].startswith(f'DELETE FROM "{OutstandingToken._meta.db_table}"')
+        ]
+        self.assertEqual(len(deletes), 3)
@@ -0,0 +1,83 @@
+"""
+Gantt timeline rows for the dashboard.
+
+Rows are read as a flat projection joined to the project title and paged by
+keyset on ``(due_date, id)``, so each page costs one indexed query no matter
+how much history the Task table holds.
+"""
+import base64
+import binascii
+from datetime import date
+
+from django.db.models import Q
+
+TIMELINE_FIELDS = ('id', 'title', 'status', 'created_at', 'due_date', 'project__title')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def calculate_duration(start_date, end_date):
+    if not end_date:
+        return 1  # Default duration if no end date
+    duration = (end_date - start_date).days
+    return max(duration, 1)  # Minimum duration of 1 day
+
+
+def encode_cursor(row):
+    raw = f"{row['due_date'].isoformat()}:{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        due_date, task_id = raw.split(':')
+        return date.fromisoformat(due_date), int(task_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def timeline_queryset(tasks, start=None, end=None, project=None):
+    """Restrict ``tasks`` to a due date window and project, keyset ordered."""
+    tasks = tasks.filter(due_date__isnull=False)
+    if start:
+        tasks = tasks.filter(due_date__gte=start)
+    if end:
+        tasks = tasks.filter(due_date__lte=end)
+    if project:
+        tasks = tasks.filter(project_id=project)
+    return tasks.order_by('due_date', 'id').values(*TIMELINE_FIELDS)
+
+
+def timeline_entry(row):
+    created = row['created_at'].date()
+    return {
+        'id': row['id'],
+        'text': row['title'],
+        'start_date': created.strftime('%Y-%m-%d'),
+        'duration': calculate_duration(created, row['due_date']),
+        'progress': 1 if row['status'] == 'DONE' else 0.5 if row['status'] == 'IN_PROGRESS' else 0,
+        'project': row['project__title'] or 'No Project',
+    }
+
+
+def timeline_page(rows, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of Gantt entries after ``cursor`` together with the
+    cursor of the next page (or None on the last page).
+    """
+    if cursor:
+        due_date, task_id = decode_cursor(cursor)
+        rows = rows.filter(Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=task_id))
+
+    page = list(rows[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return {
+        'data': [timeline_entry(row) for row in page[:limit]],
+        'next': next_cursor,
+    }
@@ -0,0 +1,208 @@
+"""
+Refresh tokens with an in-memory revocation check, and blacklist pruning.
+
+simplejwt checks every refresh token against ``BlacklistedToken`` with a
+query. ``RefreshToken`` here first asks ``revoked``, a set of 64-bit hashes
+of the blacklisted jtis. The set is loaded on first use and then topped up
+with the rows added since the last read, at most every
+``TOKEN_REVOCATION['REFRESH_INTERVAL']`` seconds. A jti that is not in the
+set is accepted without a query. A hit is confirmed against the table, so
+hash collisions and already pruned entries cost one query but are never
+wrong. Tokens blacklisted in this process are added straight away. Tokens
+blacklisted by other processes are seen after the refresh interval.
+
+The blacklist tables only ever grow, so ``prune_expired_tokens`` deletes
+outstanding tokens (and, by cascade, their blacklist entries) that have
+expired. Use ``manage.py prune_tokens`` to run it, or set
+``TOKEN_PRUNE_INTERVAL`` to run it from a background thread.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 3600,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_REVOCATION', {})}
+
+
+def jti_hash(jti):
+    return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), 'big')
+
+
+class RevocationFilter:
+    def __init__(self):
+        self._hashes = set()
+        self._last_id = 0
+        self._refreshed_at = None
+        self._rebuilt_at = None
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        """Reload the hashes of every unexpired blacklisted token."""
+        rows = BlacklistedToken.objects.filter(
+            token__expires_at__gt=aware_utcnow()
+        ).values_list('pk', 'token__jti')
+        hashes, last_id = set(), 0
+        for pk, jti in rows.iterator():
+            hashes.add(jti_hash(jti))
+            last_id = max(last_id, pk)
+        now = time.monotonic()
+        with self._lock:
+            self._hashes = hashes
+            self._last_id = last_id
+            self._refreshed_at = self._rebuilt_at = now
+
+    def refresh(self):
+        """Add the tokens blacklisted since the last read."""
+        with self._lock:
+            last_id = self._last_id
+        rows = list(BlacklistedToken.objects.filter(pk__gt=last_id).values_list('pk', 'token__jti'))
+        with self._lock:
+            self._hashes.update(jti_hash(jti) for _, jti in rows)
+            self._last_id = max([self._last_id, *(pk for pk, _ in rows)])
+            self._refreshed_at = time.monotonic()
+
+    def _sync(self):
+        config = get_config()
+        now = time.monotonic()
+        if self._rebuilt_at is None or now - self._rebuilt_at >= config['REBUILD_INTERVAL']:
+            self.rebuild()
+        elif now - self._refreshed_at >= config['REFRESH_INTERVAL']:
+            self.refresh()
+
+    def add(self, jti):
+        with self._lock:
+            self._hashes.add(jti_hash(jti))
+
+    def might_contain(self, jti):
+        self._sync()
+        with self._lock:
+            return jti_hash(jti) in self._hashes
+
+    def reset(self):
+        with self._lock:
+            self._hashes = set()
+            self._last_id = 0
+            self._refreshed_at = self._rebuilt_at = None
+
+
+revoked = RevocationFilter()
+
+
+class RefreshToken(tokens.RefreshToken):
+    def check_blacklist(self):
+        if revoked.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        result = super().blacklist()
+        transaction.on_commit(lambda: revoked.add(jti))
+        return result
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refreshes with the revocation filter, and checks the user through the
+    cached user row of ``CachedUserJWTAuthentication`` instead of loading it
+    on every refresh.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        from .authentication import CachedUserJWTAuthentication
+
+        refresh = self.token_class(attrs['refresh'])
+        try:
+            CachedUserJWTAuthentication().get_user(refresh)
+        except AuthenticationFailed:
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account'
+            )
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Delete expired outstanding tokens and their blacklist entries, committing
+    ``batch_size`` tokens at a time. Returns the number of tokens deleted.
+    """
+    now = aware_utcnow()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(OutstandingToken.objects.filter(
+                expires_at__lte=now
+            ).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+    if deleted:
+        # Drop the pruned hashes on the next check
+        revoked.reset()
+    return deleted
+
+
+_pruner = None
+_pruner_lock = threading.Lock()
+
+
+def _prune_periodically(interval, batch_size):
+    while True:
+        time.sleep(interval)
+        close_old_connections()
+        try:
+            deleted = prune_expired_tokens(batch_size)
+            if deleted:
+                logger.info('Pruned %d expired tokens', deleted)
+        except Exception:
+            logger.exception('Failed to prune expired tokens')
+        finally:
+            close_old_connections()
+
+
+def start_pruning(**kwargs):
+    """Start the periodic pruning thread once, if TOKEN_PRUNE_INTERVAL is set."""
+    global _pruner
+    interval = getattr(settings, 'TOKEN_PRUNE_INTERVAL', 0)
+    if not interval:
+        return
+    with _pruner_lock:
+        if _pruner is None:
+            _pruner = threading.Thread(
+                target=_prune_periodically,
+                args=(interval, getattr(settings, 'TOKEN_PRUNE_BATCH_SIZE', 1000)),
+                name='token-pruner',
+                daemon=True,
+            )
+            _pruner.start()
+    request_started.disconnect(start_pruning)
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from . import async_views, stream, views
+from .tokens import TokenRefreshSerializer
 
 router = DefaultRouter()
 router.register(r'projects', views.ProjectViewSet)
@@ -14,7 +15,7 @@ urlpatterns = [
     path('register/', views.register_user, name='register'),
     path('login/', views.login_user, name='login'),
     path('logout/', views.logout_user, name='logout'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', TokenRefreshView.as_view(serializer_class=TokenRefreshSerializer), name='token_refresh'),
     path('users/status/', views.get_users_by_status, name='users-status'),
     path('users/<int:user_id>/approval/', views.update_member_approval, name='update-member-approval'),
     path('users/<int:user_id>/delete/', views.delete_team_member, name='delete-team-member'),
@@ -26,4 +27,16 @@ urlpatterns = [
     path('tasks/<int:pk>/update_status/', views.TaskViewSet.as_view({'patch': 'update_status'}), name='update-task-status'),
     path('notifications/<int:pk>/mark_read/', views.NotificationViewSet.as_view({'patch': 'mark_read'}), name='mark-notification-read'),
     path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
+    path('dashboard/timeline/', views.dashboard_timeline, name='dashboard-timeline'),
+    path('dashboard/cache-stats/', views.dashboard_cache_stats, name='dashboard-cache-stats'),
+    path('search/', views.search_objects, name='search'),
+    path('stats/views/', views.view_query_stats, name='view-query-stats'),
+    path('profiles/', views.profile_list, name='profile-list'),
+    path('profiles/<str:profile_id>/', views.profile_detail, name='profile-detail'),
+    path('events/stream/', stream.event_stream, name='event-stream'),
+    path('async/dashboard/stats/', async_views.dashboard_stats, name='async-dashboard-stats'),
+    path('async/team-members/', async_views.get_team_members, name='async-team-members'),
+    path('async/users/status/', async_views.get_users_by_status, name='async-users-status'),
+    path('async/tasks/', async_views.task_list, name='async-task-list'),
+    path('async/projects/', async_views.project_list, name='async-project-list'),
 ] 
\ No newline at end of file
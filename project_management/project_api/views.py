@@ -3,14 +3,32 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from django.shortcuts import get_object_or_404
-from django.db import models
+from django.db import models, transaction
 from .models import User, Project, Task, Comment, Notification
-from .serializers import ProjectSerializer, TaskSerializer, CommentSerializer, UserSerializer, UserUpdateSerializer, PasswordChangeSerializer, NotificationSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .serializers import BulkTaskCreateSerializer, ProjectSerializer, TaskSerializer, CommentSerializer, UserSerializer, UserUpdateSerializer, PasswordChangeSerializer, NotificationSerializer
 from django.db.models import Q
 from rest_framework.exceptions import PermissionDenied
 from django.contrib.auth.hashers import check_password
+from django.conf import settings
+from django.utils.dateparse import parse_date
 from django.db.models import Count, F
+from django.http import FileResponse
+from mysite import middleware as instrumentation
+from mysite import profiling
+from . import bulk, notifications, search
+from .authentication import load_full_user, tokens_for_user
+from . import cache as dashboard_cache
+from .membership import get_membership
+from .notifications import notify, send
+from .pagination import CursorPaginationMixin
+from .routers import reporting_view
+from .sqlite import retry_on_lock
+from .tokens import RefreshToken
+from .timeline import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, calculate_duration, timeline_page, timeline_queryset
+from .stats import DONE, ON_TIME, build_dashboard_stats, calculate_efficiency, calculate_team_efficiency
+
+# Comment threads read oldest first, whichever pagination the client picks
+COMMENT_ORDERING = ('created_at', 'id')
 
 
 @api_view(['POST'])
@@ -41,7 +59,7 @@ def register_user(request):
             role=request.data.get('role', 'TEAM_MEMBER'),
             is_approved=False
         )
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -76,7 +94,7 @@ def login_user(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
 
-    refresh = RefreshToken.for_user(user)
+    refresh = tokens_for_user(user)
     serialized_user = UserSerializer(user).data
     
     return Response({
@@ -124,39 +142,52 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({'error': 'wrong password'}, status=400)
         return Response(serializer.errors, status=400)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def apply_fetch_plan(queryset, serializer):
+    """Apply ``serializer``'s select/prefetch plan for the rendered fields."""
+    select_related, prefetch_related = serializer.get_fetch_plan()
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+class FetchPlanMixin:
+    """Apply the serializer's select/prefetch plan for the rendered fields."""
+
+    def apply_fetch_plan(self, queryset):
+        return apply_fetch_plan(queryset, self.get_serializer())
+
+class ProjectViewSet(FetchPlanMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Project.objects.filter(
-            models.Q(members=self.request.user) | 
-            models.Q(owner=self.request.user)
-        ).distinct()
+        visible_ids = get_membership(self.request).visible_ids
+        return self.apply_fetch_plan(
+            Project.objects.filter(pk__in=visible_ids).with_completion()
+        )
 
     def perform_create(self, serializer):
         members_data = self.request.data.get('members', [])
-        project = serializer.save(owner=self.request.user)
+        project = serializer.save(owner=load_full_user(self.request.user))
         
         # Add members to the project
         if members_data:
             members = User.objects.filter(id__in=members_data)
             project.members.set(members)
             
-            # Create notifications for all members
-            for member in members:
-                if member != self.request.user:  # Don't notify the creator
-                    Notification.objects.create(
-                        user=member,
-                        type='project',
-                        title=f'New Project: {project.title}',
-                        message=f'You have been added to project "{project.title}"'
-                    )
+            # Notify all members in one batch, except the creator
+            notify(
+                [member for member in members if member != self.request.user],
+                type='project',
+                title=f'New Project: {project.title}',
+                message=f'You have been added to project "{project.title}"'
+            )
     
     def destroy(self, request, *args, **kwargs):
         project = self.get_object()
-        if project.owner != request.user:
+        if not get_membership(request).owns(project.pk):
             return Response(
                 {'error': 'Only project owner can delete the project'},
                 status=status.HTTP_403_FORBIDDEN
@@ -165,7 +196,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         project = self.get_object()
-        if project.owner != request.user:
+        if not get_membership(request).owns(project.pk):
             return Response(
                 {'error': 'Only project owner can update the project'},
                 status=status.HTTP_403_FORBIDDEN
@@ -202,17 +233,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response({'status': 'member removed'})
         return Response({'error': 'user_id required'}, status=400)
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(CursorPaginationMixin, FetchPlanMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        if user.role == 'ADMIN':
-            return Task.objects.all()
-        return Task.objects.filter(assigned_to=user)
+        tasks = Task.objects.all() if user.role == 'ADMIN' else Task.objects.filter(assigned_to=user)
+        if self.action == 'list' and 'comment_count' in self.get_serializer().fields:
+            tasks = tasks.with_comment_count()
+        return self.apply_fetch_plan(tasks)
+
+    def get_cursor_ordering(self):
+        if self.action == 'comments':
+            return COMMENT_ORDERING
+        return super().get_cursor_ordering()
 
     @action(detail=True, methods=['PATCH'])
+    @retry_on_lock
     def update_status(self, request, pk=None):
         task = self.get_object()
         user = request.user
@@ -232,18 +270,168 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['GET'], url_path='my-tasks/(?P<user_id>[^/.]+)?')
     def my_tasks(self, request, user_id=None):
-        tasks = Task.objects.filter(assigned_to=request.user)
+        tasks = self.apply_fetch_plan(Task.objects.filter(assigned_to=request.user))
         serializer = self.get_serializer(tasks, many=True)
         return Response({
             'results': serializer.data
         })
 
+    def check_bulk_access(self, request, rows, ids, allowed=None):
+        """
+        Return an error Response when any id is missing, outside
+        ``get_queryset`` (admins see every task, team members only the tasks
+        assigned to them) or fails ``allowed(row)``, otherwise None.
+        """
+        user = request.user
+        missing = [
+            task_id for task_id in ids
+            if task_id not in rows or not (
+                user.role == 'ADMIN' or rows[task_id]['assigned_to_id'] == user.pk
+            )
+        ]
+        if missing:
+            return Response({'error': 'Tasks not found', 'ids': missing}, status=status.HTTP_404_NOT_FOUND)
+        forbidden = [task_id for task_id in ids if allowed and not allowed(rows[task_id])]
+        if forbidden:
+            return Response(
+                {'error': 'You don\'t have permission to modify these tasks', 'ids': forbidden},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return None
+
+    @action(detail=False, methods=['POST'])
+    @retry_on_lock
+    def bulk_create(self, request):
+        if not isinstance(request.data, list) or not 0 < len(request.data) <= bulk.MAX_ITEMS:
+            return Response(
+                {'error': f'Expected a list of 1 to {bulk.MAX_ITEMS} tasks'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = BulkTaskCreateSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        payloads = serializer.validated_data
+
+        project_ids = {data['project_id'] for data in payloads}
+        if request.user.role == 'ADMIN':
+            visible = set(Project.objects.filter(pk__in=project_ids).values_list('pk', flat=True))
+        else:
+            visible = get_membership(request).visible_ids
+        if project_ids - visible:
+            return Response(
+                {'error': 'You don\'t have permission to add tasks to these projects',
+                 'projects': sorted(project_ids - visible)},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        assignee_ids = {data['assigned_to_id'] for data in payloads}
+        existing = set(User.objects.filter(pk__in=assignee_ids).values_list('pk', flat=True))
+        if assignee_ids - existing:
+            return Response(
+                {'error': 'User not found', 'ids': sorted(assignee_ids - existing)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = bulk.create_tasks(payloads, created_by=request.user.pk)
+        created = Task.objects.filter(pk__in=[task.pk for task in tasks]).select_related(
+            'project', 'assigned_to'
+        ).order_by('id')
+        return Response(TaskSerializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['POST'])
+    @retry_on_lock
+    def bulk_status(self, request):
+        try:
+            data = bulk.parse_body(request.data)
+            new_status = data.get('status')
+            if new_status not in dict(Task.STATUS_CHOICES):
+                return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+            ids = bulk.parse_ids(data.get('ids'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The rows (and the counter deltas computed from them) are read in
+        # the transaction that changes them, so they cannot go stale
+        with transaction.atomic():
+            rows = bulk.load_rows(ids)
+            # Same rule as update_status: admins or the assigned team member
+            error = self.check_bulk_access(request, rows, ids)
+            if error:
+                return error
+            return Response({'updated': bulk.update_tasks(rows, status=new_status)})
+
+    @action(detail=False, methods=['POST'])
+    @retry_on_lock
+    def bulk_reassign(self, request):
+        try:
+            data = bulk.parse_body(request.data)
+            assignee_id = bulk.parse_id(data.get('assigned_to_id'), 'assigned_to_id')
+            ids = bulk.parse_ids(data.get('ids'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        assignee = get_object_or_404(User, pk=assignee_id)
+
+        membership = get_membership(request)
+        with transaction.atomic():
+            rows = bulk.load_rows(ids)
+            # Same rule as update: tasks from get_queryset whose project the
+            # user owns or is a member of
+            error = self.check_bulk_access(
+                request, rows, ids, lambda row: membership.can_view(row['project_id'])
+            )
+            if error:
+                return error
+            updated = bulk.update_tasks(rows, assigned_to_id=assignee.pk)
+            reassigned = [
+                {**row, 'assigned_to_id': assignee.pk} for row in rows.values()
+                if row['assigned_to_id'] != assignee.pk
+            ]
+            send(bulk.assignment_notifications(reassigned, exclude_user_id=request.user.pk))
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['POST'])
+    @retry_on_lock
+    def bulk_delete(self, request):
+        try:
+            ids = bulk.parse_ids(bulk.parse_body(request.data).get('ids'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        membership = get_membership(request)
+        with transaction.atomic():
+            rows = bulk.load_rows(ids)
+            # Same rule as destroy: tasks from get_queryset in projects the user owns
+            error = self.check_bulk_access(
+                request, rows, ids, lambda row: membership.owns(row['project_id'])
+            )
+            if error:
+                return error
+            return Response({'deleted': bulk.delete_tasks(rows)})
+
+    @action(detail=True, methods=['GET'])
+    def comments(self, request, pk=None):
+        user = request.user
+        # One access check: admins, the assignee and anyone who can see the
+        # task's project may read its comments
+        visible = Task.objects.filter(pk=pk)
+        if user.role != 'ADMIN':
+            visible = visible.filter(
+                Q(assigned_to=user) |
+                Q(project_id__in=get_membership(request).visible_ids)
+            )
+        if not visible.exists():
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        comments = Comment.objects.filter(task_id=pk).select_related('author').order_by(*COMMENT_ORDERING)
+        page = self.paginate_queryset(comments)
+        if page is not None:
+            return self.get_paginated_response(CommentSerializer(page, many=True).data)
+        return Response(CommentSerializer(comments, many=True).data)
+
     def perform_create(self, serializer):
         task = serializer.save()
         # Create notification for assigned user
         if task.assigned_to and task.assigned_to != self.request.user:
-            Notification.objects.create(
-                user=task.assigned_to,
+            notify(
+                [task.assigned_to],
                 type='task',
                 title=f'New Task: {task.title}',
                 message=f'You have been assigned to task "{task.title}"'
@@ -251,7 +439,7 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         task = self.get_object()
-        if task.project.owner != request.user and request.user not in task.project.members.all():
+        if not get_membership(request).can_view(task.project_id):
             return Response(
                 {'error': 'You don\'t have permission to update this task'},
                 status=status.HTTP_403_FORBIDDEN
@@ -260,25 +448,28 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         task = self.get_object()
-        if task.project.owner != request.user:
+        if not get_membership(request).owns(task.project_id):
             return Response(
                 {'error': 'Only project owner can delete tasks'},
                 status=status.HTTP_403_FORBIDDEN
             )
         return super().destroy(request, *args, **kwargs)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    cursor_ordering = COMMENT_ORDERING
     
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        serializer.save(author=load_full_user(self.request.user))
     
     def get_queryset(self):
-        return Comment.objects.filter(task__project__members=self.request.user) | \
-               Comment.objects.filter(task__project__owner=self.request.user)
+        visible_ids = get_membership(self.request).visible_ids
+        return Comment.objects.filter(
+            task__project_id__in=visible_ids
+        ).select_related('author').order_by(*COMMENT_ORDERING)
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'patch']  # Only allow GET and PATCH methods
@@ -289,12 +480,25 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return Notification.objects.none()
     
     @action(detail=True, methods=['patch'])
+    @retry_on_lock
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        notifications.mark_read(request.user, pk=notification.pk)
         return Response({'status': 'marked as read'})
 
+    @action(detail=False, methods=['patch'])
+    @retry_on_lock
+    def mark_all_read(self, request):
+        updated = notifications.mark_read(request.user)
+        return Response({'status': 'marked as read', 'updated': updated})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        count = User.objects.filter(pk=request.user.pk).values_list(
+            'unread_notifications', flat=True
+        ).first()
+        return Response({'unread_count': count or 0})
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def update_member_approval(request, user_id):
@@ -427,123 +631,172 @@ def change_user_password(request, user_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
+    # Not a reporting view: a payload read from the lagging replica would be
+    # cached under generations that already count newer writes
+    return Response(dashboard_cache.get_or_build(request.user, build_dashboard_payload))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_cache_stats(request):
+    if request.user.role != 'ADMIN':
+        return Response(
+            {'error': 'Only admins can view cache statistics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(dashboard_cache.stats())
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def view_query_stats(request):
+    if request.user.role != 'ADMIN':
+        return Response(
+            {'error': 'Only admins can view request statistics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if request.method == 'DELETE':
+        instrumentation.stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(instrumentation.view_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_objects(request):
+    query = request.query_params.get('q', '')
+    if not search.parse_terms(query):
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    kinds = request.query_params.get('type')
+    kinds = kinds.split(',') if kinds else list(search.KINDS)
+    if not set(kinds) <= set(search.KINDS):
+        return Response(
+            {'error': f'type must be one or more of {", ".join(search.KINDS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), 100)
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or offset < 0:
+        return Response({'error': 'Invalid limit or offset'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = search.search(
+        request.user, get_membership(request).visible_ids, query,
+        kinds=kinds, limit=limit, offset=offset
+    )
+    return Response({
+        'results': results,
+        'next_offset': offset + limit if len(results) == limit else None,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profile_list(request):
+    if not profiling.can_profile(request.user):
+        return Response(
+            {'error': 'Only admins can view profiles'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(profiling.list_profiles())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profile_detail(request, profile_id):
+    if not profiling.can_profile(request.user):
+        return Response(
+            {'error': 'Only admins can view profiles'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    try:
+        top = int(request.query_params.get('top', 0))
+    except ValueError:
+        return Response({'error': 'top must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.query_params.get('download'):
+        # The raw pstats file, for snakeviz or python -m pstats
+        path = profiling.profile_path(profile_id)
+        if path is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=profile_id)
+    summary = profiling.load_summary(profile_id, limit=top)
+    if summary is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'id': profile_id, **summary})
+
+def parse_date_param(value):
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f'Invalid date: {value}')
+    return parsed
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@reporting_view
+def dashboard_timeline(request):
+    params = request.query_params
+    try:
+        start, end = (parse_date_param(params.get(name)) for name in ('start', 'end'))
+        limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        project = int(params['project']) if params.get('project') else None
+    except ValueError:
+        return Response(
+            {'error': 'start/end must be YYYY-MM-DD dates and limit and project integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     user = request.user
-    
+    tasks = Task.objects.all() if user.role == 'ADMIN' else Task.objects.filter(assigned_to=user)
+    rows = timeline_queryset(tasks, start=start, end=end, project=project)
+    try:
+        return Response(timeline_page(rows, cursor=params.get('cursor'), limit=limit))
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+def dashboard_querysets(user):
+    """Return the ``(tasks, team_members)`` a user's dashboard covers."""
     if user.role == 'ADMIN':
         tasks = Task.objects.all()
-        projects = Project.objects.all()
         
         # Get only team members (excluding admins)
         team_members = User.objects.filter(is_approved=True, role='TEAM_MEMBER')
-        team_efficiency = []
-        
-        for member in team_members:
-            member_tasks = Task.objects.filter(assigned_to=member)
-            team_efficiency.append({
-                'name': member.username,
-                'tasksCompleted': member_tasks.filter(status='DONE').count(),
-                'totalTasks': member_tasks.count(),
-                'efficiency': calculate_user_efficiency(member, member_tasks),
-                'onTime': member_tasks.filter(status='DONE', due_date__gte=F('updated_at')).count(),
-                'delayed': member_tasks.filter(status='DONE', due_date__lt=F('updated_at')).count()
-            })
     else:
         # Team member sees only their own tasks and stats
         tasks = Task.objects.filter(assigned_to=user).distinct()
-        projects = Project.objects.filter(
-            models.Q(members=user) |
-            models.Q(owner=user)
-        ).distinct()
-        
-        team_efficiency = [{
-            'name': user.username,
-            'tasksCompleted': tasks.filter(status='DONE').count(),
-            'totalTasks': tasks.count(),
-            'efficiency': calculate_user_efficiency(user, tasks),
-            'onTime': tasks.filter(status='DONE', due_date__gte=F('updated_at')).count(),
-            'delayed': tasks.filter(status='DONE', due_date__lt=F('updated_at')).count()
-        }]
-
-    # Task statistics
-    task_stats = {
-        'todo': tasks.filter(status='TODO').count(),
-        'in_progress': tasks.filter(status='IN_PROGRESS').count(),
-        'done': tasks.filter(status='DONE').count(),
-    }
+        team_members = User.objects.filter(pk=user.pk)
+    return tasks, team_members
 
-    # Timeline data (Gantt chart)
-    timeline_data = {
-        'data': [
-            {
-                'id': task.id,
-                'text': task.title,
-                'start_date': task.created_at.strftime('%Y-%m-%d'),
-                'duration': calculate_duration(task.created_at.date(), task.due_date),
-                'progress': 1 if task.status == 'DONE' else 0.5 if task.status == 'IN_PROGRESS' else 0,
-                'project': task.project.title if task.project else 'No Project'
-            }
-            for task in tasks if task.due_date  # Only include tasks with due dates
-        ]
-    }
+def build_dashboard_payload(user):
+    tasks, team_members = dashboard_querysets(user)
 
-    return Response({
+    # Task statistics come from one grouped count; the per-member efficiency
+    # figures are read from the counters maintained on User
+    task_stats, team_efficiency = build_dashboard_stats(tasks, team_members)
+
+    # Timeline data (Gantt chart): the first page of the timeline endpoint,
+    # which the client can continue from with the returned cursor
+    timeline_data = timeline_page(
+        timeline_queryset(tasks),
+        limit=getattr(settings, 'DASHBOARD_TIMELINE_LIMIT', MAX_PAGE_SIZE)
+    )
+
+    return {
         'taskStats': task_stats,
         'teamEfficiency': team_efficiency,
         'timelineData': timeline_data
-    })
+    }
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@retry_on_lock
 def mark_notification_read(request, notification_id):
-    try:
-        notification = Notification.objects.get(id=notification_id, user=request.user)
-        notification.is_read = True
-        notification.save()
-        return Response({'status': 'marked as read'})
-    except Notification.DoesNotExist:
+    if not notifications.mark_read(request.user, id=notification_id) and not (
+        Notification.objects.filter(id=notification_id, user=request.user).exists()
+    ):
         return Response({'error': 'Notification not found'}, status=404)
+    return Response({'status': 'marked as read'})
 def calculate_user_efficiency(user, tasks):
-    total_tasks = tasks.filter(assigned_to=user).count()
-    if total_tasks == 0:
-        return 0
-        
-    completed_tasks = tasks.filter(
-        assigned_to=user,
-        status='DONE'
-    ).count()
-    
-    on_time_tasks = tasks.filter(
-        assigned_to=user,
-        status='DONE',
-        due_date__gte=F('updated_at')
-    ).count()
-    
-    if completed_tasks == 0:
-        return 0
-        
-    efficiency = (on_time_tasks / completed_tasks) * 100
-    return round(efficiency, 1)
-
-def calculate_team_efficiency(tasks):
-    team_members = User.objects.filter(role='TEAM_MEMBER', is_approved=True)
-    team_stats = []
-    
-    for member in team_members:
-        member_tasks = tasks.filter(assigned_to=member)
-        team_stats.append({
-            'name': member.username,
-            'tasksCompleted': member_tasks.filter(status='DONE').count(),
-            'totalTasks': member_tasks.count(),
-            'efficiency': calculate_user_efficiency(member, member_tasks),
-            'onTime': member_tasks.filter(status='DONE', due_date__gte=F('updated_at')).count(),
-            'delayed': member_tasks.filter(status='DONE', due_date__lt=F('updated_at')).count()
-        })
-    
-    return team_stats
-
-def calculate_duration(start_date, end_date):
-    if not end_date:
-        return 1  # Default duration if no end date
-    duration = (end_date - start_date).days
-    return max(duration, 1)  # Minimum duration of 1 day
-
+    counts = tasks.filter(assigned_to=user).aggregate(
+        completed=Count('id', filter=DONE),
+        on_time=Count('id', filter=ON_TIME),
+    )
+    return calculate_efficiency(counts['completed'], counts['on_time'])